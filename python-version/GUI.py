@@ -1,10 +1,11 @@
+import os
 import pygame
 import sys
-# Initiate pygame
-pygame.init()
-pygame.font.init()
 
-from generate import generate_puzzle
+from corpus import Corpus
+from generate import DIFFICULTIES
+from hints import Candidates
+from prefetch import PuzzlePrefetcher
 
 
 # Website for sudoku puzzles and queries corresponding to puzzle difficulties
@@ -16,6 +17,9 @@ QUERIES = {
     "evil": "?level=4"
 }
 
+# Pre-generated puzzles are served from this corpus file (built with corpus.py) when it exists
+CORPUSFILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "puzzles.corpus")
+
 # Window constants
 WIDTH = 525
 HEIGHT = 600
@@ -31,16 +35,54 @@ LIGHTGREY = (225, 225, 225)
 RED = (245, 87, 87)
 BLUE = (0, 0, 245)
 BLACK = (0, 0, 0)
-LARGEFONT = pygame.font.SysFont("Courier", 30)
-BUTTONFONT = pygame.font.SysFont("Courier", 16)
-SMALLFONT = pygame.font.SysFont("Courier", 13)
-NUMBERFONT = pygame.font.SysFont("Helvetica", 30)
-SMALLNUMBERFONT = pygame.font.SysFont("Helvetica", 14)
-
-# Window and dictionary relating pygame keypresses to integers
-DISPLAY = pygame.display.set_mode((WIDTH, HEIGHT))
+
+# Fonts, window and digit images are made by init the first time something is drawn,
+# so importing this module does not look up fonts or need a display
+LARGEFONT = None
+BUTTONFONT = None
+SMALLFONT = None
+NUMBERFONT = None
+SMALLNUMBERFONT = None
+DISPLAY = None
+# Digit and note images rendered once and reused every frame
+NUMBERGLYPHS = None
+NOTEGLYPHS = None
+
+# Dictionary relating pygame keypresses to integers
 NUMBERKEYS = {pygame.K_1: 1, pygame.K_2: 2, pygame.K_3: 3, pygame.K_4: 4, pygame.K_5: 5, pygame.K_6: 6, pygame.K_7: 7, pygame.K_8: 8, pygame.K_9: 9}
 
+# Frame rate cap for the main loop
+FPS = 30
+# Area of the window where the wrong guess counter is drawn
+GUESSRECT = pygame.Rect(0, HEIGHT - 75, 190, 50)
+# Area of the start page where the loading message is drawn while a puzzle is being generated
+LOADINGRECT = pygame.Rect(0, HEIGHT / 2 + 70, WIDTH, 40)
+# Offset of each note's center from the top left of its box, notes 1-3 on the top row, 4-6 in the middle and 7-9 on the bottom
+NOTEOFFSETS = {
+    note: ((1.2, 2.5, 3.8)[(note - 1) % 3] * (BOXSIZE / 5), (1.2, 2.6, 4)[(note - 1) // 3] * (BOXSIZE / 5))
+    for note in range(1, FIELDSIZE + 1)
+}
+
+
+def init():
+    """
+    Starts the pygame display and font modules, loads the fonts, opens the window and renders the digit images. Does nothing after the first call.
+    Only the display and font modules are started, since the game uses no sound.
+    """
+    global LARGEFONT, BUTTONFONT, SMALLFONT, NUMBERFONT, SMALLNUMBERFONT, DISPLAY, NUMBERGLYPHS, NOTEGLYPHS
+    if DISPLAY is not None:
+        return
+    pygame.display.init()
+    pygame.font.init()
+    LARGEFONT = pygame.font.SysFont("Courier", 30)
+    BUTTONFONT = pygame.font.SysFont("Courier", 16)
+    SMALLFONT = pygame.font.SysFont("Courier", 13)
+    NUMBERFONT = pygame.font.SysFont("Helvetica", 30)
+    SMALLNUMBERFONT = pygame.font.SysFont("Helvetica", 14)
+    DISPLAY = pygame.display.set_mode((WIDTH, HEIGHT))
+    NUMBERGLYPHS = {number: NUMBERFONT.render(str(number), True, BLACK) for number in range(1, FIELDSIZE + 1)}
+    NOTEGLYPHS = {number: SMALLNUMBERFONT.render(str(number), True, BLACK) for number in range(1, FIELDSIZE + 1)}
+
 
 def start_page():
     """
@@ -121,85 +163,97 @@ class Board:
         self.puzzle = puzzle
         self.solved = solved
         self.selected = None
-        # Permanents is a list of boxes whose values cannot be deleted
-        self.permanents = []
-        self.notes = dict()
+        # Permanents is a bitmask of boxes whose values cannot be deleted, with bit x * 9 + y for box (x, y)
+        self.permanents = 0
+        # Notes holds a bitmask for every box, where bit n is set if note n is shown in the box
+        self.notes = []
+        # Dictionary relating each box to the state it was last drawn in, so only boxes that changed are drawn again
+        self.drawn = dict()
+        # Candidates tracks which digits can go in every space and is updated with every number drawn or deleted, leaving out wrong numbers
+        self.candidates = Candidates(puzzle, solved)
         self.init_notes()
         self.update_permanents()
 
     def init_notes(self):
-        for box_x in range(FIELDSIZE):
-            for box_y in range(FIELDSIZE):
-                self.notes[(box_x, box_y)] = []
+        self.notes = [0] * (FIELDSIZE * FIELDSIZE)
 
     def update_permanents(self):
         """
-        Add any boxes that are correctly filled in with the right number to the permanent list.
+        Add any boxes that are correctly filled in with the right number to the permanents.
         """
         for box_x in range(FIELDSIZE):
             for box_y in range(FIELDSIZE):
-                if self.puzzle[box_x][box_y] == self.solved[box_x][box_y]:
-                    self.permanents.append((box_x, box_y))
-        
+                self.update_permanent(box_x, box_y)
+
+    def update_permanent(self, box_x, box_y):
+        """
+        Add box (box_x, box_y) to the permanents if it is correctly filled in with the right number.
+        """
+        if self.puzzle[box_x][box_y] == self.solved[box_x][box_y]:
+            self.permanents |= 1 << (box_x * FIELDSIZE + box_y)
+
     def draw_board(self):
         """
-        Draw the sudoku grid with white squares for empty spaces/correct numbers and red squares for incorrect numbers.
-        Draw number inside each box after the box is drawn.
+        Draw every box of the sudoku grid whose state changed since it was last drawn, and return a list of the rects that were drawn.
         """
+        init()
+        dirty = []
         for box_x in range(FIELDSIZE):
             for box_y in range(FIELDSIZE):
-                left, top = get_box_placement(box_x, box_y)
-                pygame.draw.rect(DISPLAY, WHITE, (left, top, BOXSIZE, BOXSIZE))
-
-                # If the space is not empty
-                if self.puzzle[box_x][box_y]:
-                    self.notes[(box_x, box_y)] = []
-
-                    # If the number in the space is not correct, background of box becomes red
-                    if self.puzzle[box_x][box_y] != self.solved[box_x][box_y]:
-                        pygame.draw.rect(DISPLAY, RED, (left, top, BOXSIZE, BOXSIZE))
-
-                    # Draw number
-                    number = NUMBERFONT.render(str(self.puzzle[box_x][box_y]), True, BLACK)
-                    rect = number.get_rect()
-                    rect.center = (left + BOXSIZE / 2, top + BOXSIZE / 2)
-                    DISPLAY.blit(number, rect)
-                
-                else:
-                    for note in self.notes[(box_x, box_y)]:
-                        if note % 3 == 1:
-                            width = 1.2 * (BOXSIZE / 5)
-                        elif note % 3 == 2:
-                            width = 2.5 * (BOXSIZE / 5)
-                        else:
-                            width = 3.8 * (BOXSIZE / 5)
-                        if note in range(1, 4):
-                            height = 1.2 * (BOXSIZE / 5)
-                        elif note in range(4, 7):
-                            height = 2.6 * (BOXSIZE / 5)
-                        else:
-                            height = 4 * (BOXSIZE / 5)
-                        number = SMALLNUMBERFONT.render(str(note), True, BLACK)
-                        rect = number.get_rect()
-                        rect.center = (left + width, top + height)
-                        DISPLAY.blit(number, rect)
-
-                # Draw box outline
-                if (box_x, box_y) == self.selected:
-                    pygame.draw.rect(DISPLAY, BLUE, (left, top, BOXSIZE, BOXSIZE), 2)
+                state = (self.puzzle[box_x][box_y], self.solved[box_x][box_y], self.notes[box_x * FIELDSIZE + box_y], (box_x, box_y) == self.selected)
+                if self.drawn.get((box_x, box_y)) != state:
+                    self.drawn[(box_x, box_y)] = state
+                    dirty.append(self.draw_box(box_x, box_y))
+        return dirty
+
+    def redraw(self):
+        """
+        Forget what has been drawn so that the next draw_board draws every box, e.g. after the window has been cleared.
+        """
+        self.drawn = dict()
+
+    def draw_box(self, box_x, box_y):
+        """
+        Draw box (box_x, box_y) with a white square for an empty space/correct number and a red square for an incorrect number, then its number or notes.
+        Returns the rect of the box.
+        """
+        box = BOXRECTS[box_x][box_y]
+        pygame.draw.rect(DISPLAY, WHITE, box)
+
+        # If the space is not empty
+        if self.puzzle[box_x][box_y]:
+            # If the number in the space is not correct, background of box becomes red
+            if self.puzzle[box_x][box_y] != self.solved[box_x][box_y]:
+                pygame.draw.rect(DISPLAY, RED, box)
+
+            # Draw number
+            number = NUMBERGLYPHS[self.puzzle[box_x][box_y]]
+            rect = number.get_rect()
+            rect.center = box.center
+            DISPLAY.blit(number, rect)
+
+        else:
+            notes = self.notes[box_x * FIELDSIZE + box_y]
+            for note in range(1, FIELDSIZE + 1):
+                if not notes & (1 << note):
+                    continue
+                number = NOTEGLYPHS[note]
+                rect = number.get_rect()
+                rect.center = (box.left + NOTEOFFSETS[note][0], box.top + NOTEOFFSETS[note][1])
+                DISPLAY.blit(number, rect)
+
+        # Draw box outline
+        if (box_x, box_y) == self.selected:
+            pygame.draw.rect(DISPLAY, BLUE, box, 2)
+
+        return box
 
     def select_square(self, mouse):
         """
         Given the position of the mouse when the user clicks, assign self.selected to the box in the grid that was clicked on.
         If the click was not inside any of the hitboxes for boxes in the grid, assign self.selected to None.
         """
-        self.selected = None
-        for box_x in range(FIELDSIZE):
-            for box_y in range(FIELDSIZE):
-                left, top = get_box_placement(box_x, box_y)
-                box = pygame.Rect(left, top, BOXSIZE, BOXSIZE)
-                if box.collidepoint(mouse):
-                    self.selected = (box_x, box_y)
+        self.selected = get_box_at(mouse)
 
     def draw_number(self, number, wrongGuesses):
         """
@@ -213,23 +267,27 @@ class Board:
             # If the space is empty, add the number to the space in the puzzle
             if not self.puzzle[self.selected[0]][self.selected[1]]: 
                 self.puzzle[self.selected[0]][self.selected[1]] = number
+                self.candidates.place(self.selected[0] * FIELDSIZE + self.selected[1], number)
 
                 # If the number is not correct according to the solved puzzle, add one to wrongGuesses
                 if self.puzzle[self.selected[0]][self.selected[1]] != self.solved[self.selected[0]][self.selected[1]]:
                     wrongGuesses += 1
 
-                # Update permanents list to include edited space if guess was correct
-                self.update_permanents()
+                # Notes are hidden once a number is in the space
+                self.notes[self.selected[0] * FIELDSIZE + self.selected[1]] = 0
+
+                # Update permanents to include edited space if guess was correct
+                self.update_permanent(self.selected[0], self.selected[1])
 
         return wrongGuesses
 
     def draw_notes(self, number):
+        """
+        Turn note number on or off in the selected space if that space is empty.
+        """
         if self.selected:
             if not self.puzzle[self.selected[0]][self.selected[1]]:
-                if number in self.notes[self.selected]:
-                    self.notes[self.selected].remove(number)
-                else:
-                    self.notes[self.selected].append(number)
+                self.notes[self.selected[0] * FIELDSIZE + self.selected[1]] ^= 1 << number
 
     def delete_number(self):
         """
@@ -240,14 +298,35 @@ class Board:
             # If there is a number inside the space
             if self.puzzle[self.selected[0]][self.selected[1]]: 
                 # If the space is not in permanents (number inside the space is not correct), delete the number inside the space
-                if (self.selected[0], self.selected[1]) not in self.permanents:
+                if not self.permanents & (1 << (self.selected[0] * FIELDSIZE + self.selected[1])):
                     self.puzzle[self.selected[0]][self.selected[1]] = 0
+                    self.candidates.clear(self.selected[0] * FIELDSIZE + self.selected[1])
 
     def solve_puzzle(self):
         """
         Sets the puzzle being displayed equal to the solved version of the puzzle.
         """
         self.puzzle = self.solved
+        self.candidates = Candidates(self.solved)
+
+    def fill_notes(self):
+        """
+        Replace the notes of every empty space with all of the numbers that can still go in it.
+        """
+        self.notes = self.candidates.all_notes()
+
+    def show_hint(self):
+        """
+        Select the space of the next logical move and leave only that move's number in its notes.
+        Wrong numbers are left out of the candidates, so the move can be in a space holding a wrong number, whose note shows once it is deleted.
+        Returns the (space, number, technique) tuple of the move, or None if there is no simple move.
+        """
+        step = self.candidates.next_step()
+        if step is not None:
+            space, number, _ = step
+            self.selected = divmod(space, FIELDSIZE)
+            self.notes[space] = 1 << number
+        return step
 
 
 
@@ -257,23 +336,33 @@ def get_box_placement(x, y):
     """
     Finds and returns the window coordinates for box (x, y) in the grid.
     """
-    left = MARGIN + GAP
-    for i in range(1, x + 1):
-        if i % 3 == 0:
-            left += BOXSIZE + GAP
-        else:
-            left += BOXSIZE + SMALLGAP
-    
-    top = MARGIN + GAP
-    for i in range(1, y + 1):
-        if i % 3 == 0:
-            top += BOXSIZE + GAP
-        else:
-            top += BOXSIZE + SMALLGAP
-
+    # Every box is followed by a small gap, and every third box by a large gap instead
+    left = MARGIN + GAP + x * (BOXSIZE + SMALLGAP) + (x // 3) * (GAP - SMALLGAP)
+    top = MARGIN + GAP + y * (BOXSIZE + SMALLGAP) + (y // 3) * (GAP - SMALLGAP)
     return left, top
 
 
+def get_box_at(position):
+    """
+    Returns the (x, y) box of the grid under a window position, or None if the position is not inside a box.
+    """
+    x = position[0] - MARGIN
+    y = position[1] - MARGIN
+    if 0 <= x < len(AXISBOXES) and 0 <= y < len(AXISBOXES):
+        if AXISBOXES[x] is not None and AXISBOXES[y] is not None:
+            return AXISBOXES[x], AXISBOXES[y]
+    return None
+
+
+# Grid geometry never changes, so the rect of every box is built once and indexed BOXRECTS[x][y]
+BOXRECTS = [[pygame.Rect(*get_box_placement(x, y), BOXSIZE, BOXSIZE) for y in range(FIELDSIZE)] for x in range(FIELDSIZE)]
+# Box index for every pixel along either axis of the grid, measured from MARGIN, with None for the lines between boxes
+AXISBOXES = [None] * (GAP * 4 + SMALLGAP * 6 + BOXSIZE * FIELDSIZE)
+for index in range(FIELDSIZE):
+    start = get_box_placement(index, 0)[0] - MARGIN
+    AXISBOXES[start:start + BOXSIZE] = [index] * BOXSIZE
+
+
 def pg_events(board, buttons, difficulty, wrongGuesses):
     """
     Handles all user input events that occer during the sudoku game. Returns integer amount of wrongGuesses and string/None for difficulty.
@@ -314,64 +403,130 @@ def pg_events(board, buttons, difficulty, wrongGuesses):
             if event.key == pygame.K_BACKSPACE:
                 board.delete_number()
 
+            # N fills in notes for every empty space and H shows the next logical move
+            if event.key == pygame.K_n:
+                board.fill_notes()
+            if event.key == pygame.K_h:
+                board.show_hint()
+
     return wrongGuesses, difficulty
 
 
+def next_puzzle(difficulty, corpus, prefetcher):
+    """
+    Returns a (puzzle, solution) tuple of a difficulty from the corpus if there is one, otherwise from the prefetcher.
+    Returns None if the prefetcher has no puzzle ready yet.
+    """
+    if corpus is not None and corpus.count(difficulty):
+        return corpus.random(difficulty)
+    return prefetcher.get(difficulty)
+
+
 def main():
     """
     Main function for controlling the sudoku GUI.
     """
+    init()
     pygame.display.set_caption("Sudoku")
+    clock = pygame.time.Clock()
+    corpus = None
+    if os.path.exists(CORPUSFILE):
+        try:
+            corpus = Corpus(CORPUSFILE)
+        except ValueError as error:
+            # A broken corpus file is no reason not to start; puzzles are generated instead
+            print(f"Ignoring corpus: {error}", file=sys.stderr)
+    # Difficulties the corpus has no puzzles for, like a level that failed to download, are generated in the background
+    # so that choosing a difficulty never freezes the window
+    missing = [difficulty for difficulty in DIFFICULTIES if corpus is None or not corpus.count(difficulty)]
+    prefetcher = PuzzlePrefetcher(difficulties=missing) if missing else None
     difficulty = None
+    # Difficulty that was chosen but has no puzzle ready yet
+    loading = None
     wrongGuesses = 0
-
-    while True:
-
-        # If difficulty has not been chosen, show start page
-        if difficulty is None:
-            wrongGuesses = 0
-
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    sys.exit()
-
-            DISPLAY.fill(BLACK)
-
-            # Check if any of the difficulty buttons have been clicked
-            difficultyButtons = start_page()
-            click, _, _ = pygame.mouse.get_pressed()
-            if click == 1:
-                mouse = pygame.mouse.get_pos()
-                if difficultyButtons[0].collidepoint(mouse):
-                    difficulty = 2
-                elif difficultyButtons[1].collidepoint(mouse):
-                    difficulty = 3
-                elif difficultyButtons[2].collidepoint(mouse):
-                    difficulty = 0
-                elif difficultyButtons[3].collidepoint(mouse):
-                    difficulty = 1
-
-            if difficulty is not None:
-                # Get puzzle of indicated difficulty and solve
-                # puzzle = get_puzzle(SITE, QUERIES[difficulty])
-                puzzle, solved = generate_puzzle(difficulty)
-                # Initiate grid for puzzle
-                board = Board(puzzle, solved)
-
-        # If difficulty has been chosen, display GUI for the sudoku game
-        else:
-            DISPLAY.fill(WHITE)
-            pygame.draw.rect(DISPLAY, BLACK, (MARGIN, MARGIN, GAP * 4 + SMALLGAP * 6 + (BOXSIZE * 9), GAP * 4 + SMALLGAP * 6 + (BOXSIZE * 9)))
-
-            board.draw_board()
-
-            buttons = draw_buttons([WIDTH - 130, WIDTH - 315], [HEIGHT - 70, HEIGHT - 70], 100, 40, ["Reset", "Solve"], BLACK, WHITE)
-            draw_text([50, 50, 110], [HEIGHT - 60, HEIGHT - 40, HEIGHT - 50], ["Wrong", "guesses", f": {wrongGuesses}"], [SMALLFONT, SMALLFONT, BUTTONFONT], BLACK)
-
-            wrongGuesses, difficulty = pg_events(board, buttons, difficulty, wrongGuesses)
-            
-        pygame.display.update()
-
+    # Redraw is True when the whole window has to be drawn, which only happens when switching pages
+    redraw = True
+
+    # Every way out, like closing the window on the start page or during a game, stops the prefetcher's worker processes
+    try:
+        while True:
+            # Rects of the window that changed this frame
+            dirty = []
+
+            # If difficulty has not been chosen, show start page
+            if difficulty is None:
+                wrongGuesses = 0
+
+                for event in pygame.event.get():
+                    if event.type == pygame.QUIT:
+                        sys.exit()
+
+                if redraw:
+                    DISPLAY.fill(BLACK)
+                    difficultyButtons = start_page()
+                    dirty.append(DISPLAY.get_rect())
+                    redraw = False
+
+                # Check if any of the difficulty buttons have been clicked
+                click, _, _ = pygame.mouse.get_pressed()
+                if click == 1 and loading is None:
+                    mouse = pygame.mouse.get_pos()
+                    if difficultyButtons[0].collidepoint(mouse):
+                        loading = 2
+                    elif difficultyButtons[1].collidepoint(mouse):
+                        loading = 3
+                    elif difficultyButtons[2].collidepoint(mouse):
+                        loading = 0
+                    elif difficultyButtons[3].collidepoint(mouse):
+                        loading = 1
+
+                    if loading is not None:
+                        pygame.draw.rect(DISPLAY, BLACK, LOADINGRECT)
+                        draw_text([WIDTH / 2], [LOADINGRECT.centery], ["Generating puzzle..."], [BUTTONFONT], WHITE)
+                        dirty.append(LOADINGRECT)
+
+                if loading is not None:
+                    # Get puzzle of indicated difficulty and solve
+                    # puzzle = get_puzzle(SITE, QUERIES[difficulty])
+                    puzzle = next_puzzle(loading, corpus, prefetcher)
+                    if puzzle is not None:
+                        # Initiate grid for puzzle
+                        board = Board(*puzzle)
+                        difficulty = loading
+                        loading = None
+                        redraw = True
+
+            # If difficulty has been chosen, display GUI for the sudoku game
+            else:
+                if redraw:
+                    DISPLAY.fill(WHITE)
+                    pygame.draw.rect(DISPLAY, BLACK, (MARGIN, MARGIN, GAP * 4 + SMALLGAP * 6 + (BOXSIZE * 9), GAP * 4 + SMALLGAP * 6 + (BOXSIZE * 9)))
+                    buttons = draw_buttons([WIDTH - 130, WIDTH - 315], [HEIGHT - 70, HEIGHT - 70], 100, 40, ["Reset", "Solve"], BLACK, WHITE)
+                    board.redraw()
+                    drawnGuesses = None
+                    dirty.append(DISPLAY.get_rect())
+                    redraw = False
+
+                dirty += board.draw_board()
+
+                # Only draw the wrong guess counter again when it changes
+                if wrongGuesses != drawnGuesses:
+                    pygame.draw.rect(DISPLAY, WHITE, GUESSRECT)
+                    draw_text([50, 50, 110], [HEIGHT - 60, HEIGHT - 40, HEIGHT - 50], ["Wrong", "guesses", f": {wrongGuesses}"], [SMALLFONT, SMALLFONT, BUTTONFONT], BLACK)
+                    dirty.append(GUESSRECT)
+                    drawnGuesses = wrongGuesses
+
+                wrongGuesses, difficulty = pg_events(board, buttons, difficulty, wrongGuesses)
+                redraw = difficulty is None
+
+            pygame.display.update(dirty)
+            clock.tick(FPS)
+
+    finally:
+        if prefetcher is not None:
+            prefetcher.close()
+        if corpus is not None:
+            corpus.close()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
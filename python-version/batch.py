@@ -0,0 +1,144 @@
+import multiprocessing
+
+import numpy as np
+
+from engine import solutions
+from validate import as_boards, check_boards
+
+SOLVED = "solved"
+NO_SOLUTION = "no solution"
+MULTIPLE = "multiple"
+
+# Bits 1 through 9 set, the same candidate bitmask layout as engine.py
+ALL_DIGITS = 0x3FE
+DIGIT_BITS = np.array([0] + [1 << digit for digit in range(1, 10)], dtype=np.uint16)
+SHIFTS = np.arange(1, 10, dtype=np.uint16)
+
+# Lookup tables for the number of digits in a candidate bitmask and the digit of a single-bit bitmask
+BIT_COUNT = np.array([bin(mask).count("1") for mask in range(ALL_DIGITS + 1)], dtype=np.uint8)
+SINGLE_DIGIT = np.zeros(ALL_DIGITS + 1, dtype=np.uint8)
+for digit in range(1, 10):
+    SINGLE_DIGIT[1 << digit] = digit
+
+# UNITS[u] holds the 9 spaces of row u, column u - 9 or mini-grid u - 18, numbering spaces 0 to 80
+UNITS = np.array([[row * 9 + column for column in range(9)] for row in range(9)] +
+                 [[row * 9 + column for row in range(9)] for column in range(9)] +
+                 [[(box // 3) * 27 + (box % 3) * 3 + (i // 3) * 9 + i % 3 for i in range(9)] for box in range(9)])
+# SPACE_UNITS[s] holds the 3 units of space s and SPACE_SLOTS[s] holds the position of s in each of them, as flat unit * 9 + position indices
+SPACE_UNITS = np.array([[space // 9, 9 + space % 9, 18 + (space // 27) * 3 + (space % 9) // 3] for space in range(81)])
+SPACE_SLOTS = np.array([[unit * 9 + list(UNITS[unit]).index(space) for unit in SPACE_UNITS[space]] for space in range(81)])
+
+
+def propagate(values):
+    """
+    Fills naked and hidden singles on every board of an (N, 81) uint8 array in place until nothing changes.
+    Returns an (N,) bool array that is True for every board that reached a contradiction and has no solution.
+    """
+    count = len(values)
+    dead = np.zeros(count, dtype=bool)
+    active = np.arange(count)
+
+    while len(active):
+        board = values[active]
+        empty = board == 0
+
+        # Candidates of every space are the digits not used in any of its 3 units
+        unitValues = board[:, UNITS]
+        used = np.bitwise_or.reduce(DIGIT_BITS[unitValues], axis=2)
+        # A unit with fewer digits than filled spaces repeats a digit, which two singles forcing the same digit into one unit can cause
+        stuck = (BIT_COUNT[used] != (unitValues != 0).sum(axis=2)).any(axis=1)
+        candidates = np.where(empty, ALL_DIGITS & ~np.bitwise_or.reduce(used[:, SPACE_UNITS], axis=2), 0).astype(np.uint16)
+        stuck |= (empty & (candidates == 0)).any(axis=1)
+
+        # Naked singles: spaces with exactly one candidate
+        naked = np.where(BIT_COUNT[candidates] == 1, SINGLE_DIGIT[candidates], 0)
+
+        # Hidden singles: digits that fit in exactly one space of a unit, found with bitmasks of the digits seen once and more than once
+        unitCandidates = candidates[:, UNITS]
+        once = np.zeros(unitCandidates.shape[:2], dtype=np.uint16)
+        more = np.zeros_like(once)
+        for position in range(9):
+            options = unitCandidates[:, :, position]
+            more |= once & options
+            once |= options
+        forced = np.bitwise_or.reduce((once & ~more)[:, SPACE_UNITS], axis=2) & candidates
+        forcedCount = BIT_COUNT[forced]
+        # A space that must hold two different digits means there is no solution
+        stuck |= (forcedCount > 1).any(axis=1)
+        hidden = np.where(forcedCount == 1, SINGLE_DIGIT[forced], 0)
+
+        fill = np.where(naked > 0, naked, hidden).astype(np.uint8)
+        changed = (fill > 0).any(axis=1) & ~stuck
+        values[active] = np.where(changed[:, np.newaxis], board + fill, board)
+
+        # Boards that changed go round again, which checks the numbers just filled in for repeats
+        dead[active[stuck]] = True
+        active = active[changed]
+
+    return dead
+
+
+def search_board(puzzle):
+    """
+    Searches one board that propagation could not finish and returns (status, solution), where solution is the first solution found or None.
+    """
+    found = []
+    for solution in solutions(puzzle, True):
+        found.append(solution)
+        if len(found) == 2:
+            break
+    if not found:
+        return NO_SOLUTION, None
+    return (SOLVED if len(found) == 1 else MULTIPLE), found[0]
+
+
+def solve_many(puzzles, workers=None, pool=None):
+    """
+    Solves many puzzles and returns (solved, statuses) in input order.
+    Propagation runs on the whole batch at once with NumPy, and only the boards it can't finish are searched in a pool of worker processes.
+
+    puzzles -- (N, 9, 9) array or iterable of puzzle grids\n
+    workers -- Number of processes for the search (default: one per CPU), or 1 to search in this process\n
+    pool -- multiprocessing.Pool to search in instead of starting one, so many batches can share the same workers\n
+    solved -- (N, 9, 9) uint8 array holding each solution, or one of the solutions for multiple, or zeros for no solution\n
+    statuses -- List of SOLVED, NO_SOLUTION or MULTIPLE for each puzzle\n
+    """
+    if not isinstance(puzzles, np.ndarray):
+        puzzles = list(puzzles)
+    # Boards with a value outside 0 to 9 have no solution, and are emptied so the rest of the batch can be turned into uint8
+    puzzles = np.asarray(puzzles) if len(puzzles) else np.zeros((0, 9, 9), dtype=np.uint8)
+    outside = np.zeros(len(puzzles), dtype=bool)
+    if puzzles.ndim == 3 and puzzles.dtype != np.uint8:
+        outside = ((puzzles < 0) | (puzzles > 9)).reshape(len(puzzles), -1).any(axis=1)
+        puzzles = np.where(outside[:, np.newaxis, np.newaxis], 0, puzzles)
+    boards = as_boards(puzzles)
+    values = boards.reshape(-1, 81).copy()
+    statuses = [SOLVED] * len(values)
+
+    # Boards that break a rule before anything is filled have no solution
+    dead = outside | ~check_boards(boards).valid if len(boards) else np.zeros(0, dtype=bool)
+    live = np.nonzero(~dead)[0]
+    liveValues = values[live]
+    dead[live] = propagate(liveValues)
+    values[live] = liveValues
+
+    # Propagation only makes forced moves, so a full board it reaches is the only solution
+    pending = list(np.nonzero(~dead & (values == 0).any(axis=1))[0])
+    for i in np.nonzero(dead)[0]:
+        statuses[i] = NO_SOLUTION
+        values[i] = 0
+
+    grids = [values[i].reshape(9, 9).tolist() for i in pending]
+    if workers == 1 or len(grids) < 2:
+        results = list(map(search_board, grids))
+    elif pool is not None:
+        results = pool.map(search_board, grids, chunksize=max(1, len(grids) // 64))
+    else:
+        with multiprocessing.Pool(workers) as pool:
+            results = pool.map(search_board, grids, chunksize=max(1, len(grids) // 64))
+
+    for i, (status, solution) in zip(pending, results):
+        statuses[i] = status
+        values[i] = np.array(solution, dtype=np.uint8).reshape(81) if solution else 0
+
+    return values.reshape(-1, 9, 9), statuses
@@ -0,0 +1,49 @@
+import os
+import random
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+from codec import read_lines
+from generate import generate_puzzle
+from sudoku import BACKENDS, solve
+
+HARD_FILE = os.path.join(HERE, "hard.txt")
+
+
+def time_counts(backend, puzzles):
+    """
+    Counts every solution of every puzzle with a backend and returns (total solutions, seconds).
+    """
+    start = time.perf_counter()
+    total = sum(solve(puzzle, True, backend=backend) for puzzle in puzzles)
+    return total, time.perf_counter() - start
+
+
+def main():
+    random.seed(0)
+    evil = [generate_puzzle(3)[0] for _ in range(10)]
+    # Evil puzzles with a few more numbers removed have many solutions, like the grids generate_puzzle checks
+    dug = []
+    for puzzle in evil:
+        puzzle = [row[:] for row in puzzle]
+        for _ in range(4):
+            puzzle[random.randrange(9)][random.randrange(9)] = 0
+        dug.append(puzzle)
+    with open(HARD_FILE) as f:
+        hard = list(read_lines(f))
+
+    groups = {"10 evil": evil, "10 evil, 4 more holes": dug, "hard.txt": hard}
+    for name, puzzles in groups.items():
+        for backend in BACKENDS:
+            # The original backtracker takes minutes on all but the first group, and the row-major search on the known-hard puzzles
+            if (backend == "backtrack" and name != "10 evil") or (backend == "bitmask" and name == "hard.txt"):
+                continue
+            total, seconds = time_counts(backend, puzzles)
+            print(f"{name:<22} {backend:<10} {total:>7} solutions   {seconds:9.4f}s")
+
+
+if __name__ == "__main__":
+    main()
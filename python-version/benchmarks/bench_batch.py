@@ -0,0 +1,40 @@
+import os
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+from batch import propagate, search_board, solve_many
+from generate import DIFFICULTIES, generate_many
+from validate import as_boards
+
+COUNT = 2000
+
+
+def main():
+    for difficulty in DIFFICULTIES:
+        puzzles = [puzzle for puzzle, _ in generate_many(difficulty, COUNT, seed=difficulty)]
+
+        values = as_boards(puzzles).reshape(-1, 81).copy()
+        start = time.perf_counter()
+        propagate(values)
+        propagateSeconds = time.perf_counter() - start
+        finished = (values != 0).all(axis=1).mean()
+
+        start = time.perf_counter()
+        # One search per puzzle that stops at a second solution gives the same answers as solve_many without the NumPy pass
+        results = [search_board(puzzle) for puzzle in puzzles]
+        loopSeconds = time.perf_counter() - start
+        start = time.perf_counter()
+        solved, statuses = solve_many(puzzles, 1)
+        batchSeconds = time.perf_counter() - start
+        assert statuses == [status for status, _ in results]
+        assert solved.tolist() == [solution for _, solution in results]
+
+        print(f"difficulty {difficulty}   search per puzzle {COUNT / loopSeconds:7.0f} puzzles/s   solve_many {COUNT / batchSeconds:7.0f} puzzles/s   "
+              f"propagation {propagateSeconds * 1000:6.1f} ms, finishes {finished:4.0%} of boards")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import os
+import random
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+from canonical import SolveCache, canonical_form
+from codec import read_lines
+from generate import derive_puzzles, generate_many
+from solve_csv import solve_chunk
+from sudoku import has_unique_solution, solve
+
+HARD_FILE = os.path.join(HERE, "hard.txt")
+CHUNK = 500
+
+
+def timed(function, *args):
+    """
+    Returns (result, seconds) of calling function with args.
+    """
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def csv_case(name, puzzles):
+    """
+    Solves puzzles in chunks like solve_csv, with and without a cache, and prints the hit rate and time saved.
+    """
+    def run(cache):
+        for start in range(0, len(puzzles), CHUNK):
+            solve_chunk(puzzles[start:start + CHUNK], 1, None, cache)
+
+    _, plain = timed(run, None)
+    cache = SolveCache(len(puzzles))
+    _, cached = timed(run, cache)
+    report(name, len(puzzles), cache, plain, cached)
+
+
+def report(name, count, cache, plain, cached):
+    """
+    Prints one line of results.
+    """
+    print(f"{name:<50} hit rate {cache.stats()['hitRate']:6.1%}   without cache {plain / count * 1000:7.3f} ms   "
+          f"with cache {cached / count * 1000:7.3f} ms per puzzle   saved {(plain - cached) / plain:+7.1%}")
+
+
+def main():
+    random.seed(0)
+    seeds = list(generate_many(2, 200, seed=0))
+    derived = [puzzle for puzzle, _ in derive_puzzles(seeds, 10000, random.Random(0))]
+    distinct = [puzzle for puzzle, _ in generate_many(2, 2000, seed=1)]
+    with open(HARD_FILE) as f:
+        hard = list(read_lines(f))
+    hardVariants = [puzzle for puzzle, _ in derive_puzzles([(puzzle, solve(puzzle, False, True)) for puzzle in hard], 140, random.Random(0))]
+
+    _, seconds = timed(lambda: [canonical_form(puzzle) for puzzle in distinct])
+    _, uniqueSeconds = timed(lambda: [has_unique_solution(puzzle) for puzzle in distinct])
+    print(f"canonical_form {seconds / len(distinct) * 1000:.3f} ms   has_unique_solution {uniqueSeconds / len(distinct) * 1000:.3f} ms per generated puzzle")
+
+    csv_case("solve_csv, 10000 puzzles derived from 200", derived)
+    csv_case("solve_csv, 2000 distinct generated puzzles", distinct)
+    csv_case("solve_csv, 140 variants of 7 hard puzzles", hardVariants)
+
+    # Hard puzzles take milliseconds to solve, so the cache pays off on them even in a service solving one at a time
+    cache = SolveCache()
+    _, plain = timed(lambda: [solve(puzzle, False, True) for puzzle in hardVariants])
+    _, cached = timed(lambda: [cache.solve(puzzle) for puzzle in hardVariants])
+    report("SolveCache.solve, 140 variants of 7 hard puzzles", len(hardVariants), cache, plain, cached)
+
+    # Generation checks uniqueness after every removed number, on grids one space apart, which are never equivalent
+    grids = []
+    for puzzle in distinct[:100]:
+        grid = [row[:] for row in puzzle]
+        for x, y in random.sample([(x, y) for x in range(9) for y in range(9) if grid[x][y]], 5):
+            grid[x][y] = 0
+            grids.append([row[:] for row in grid])
+    cache = SolveCache()
+    _, plain = timed(lambda: [has_unique_solution(grid) for grid in grids])
+    _, cached = timed(lambda: [cache.has_unique_solution(grid) for grid in grids])
+    report("uniqueness checks one space apart", len(grids), cache, plain, cached)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path.insert(0, ROOT)
+
+from codec import read_csv
+from generate import derive_puzzles, generate_many
+from solve_csv import write_answers
+from validate import check_boards
+
+C_SOURCE = os.path.join(ROOT, "..", "c-version", "sudoku.cpp")
+PUZZLES = 20000
+FILES = 4
+# Puzzles run through the C binary one grid at a time, the way the pipeline calls it now
+C_PUZZLES = 100
+CHUNK_SIZES = (100, 500, 2000, PUZZLES)
+
+# Runs solve_csv.main in a child and prints the peak memory of the parent process, which holds the chunks, in KiB
+MEASURED_RUN = "import resource, sys, solve_csv; sys.argv = sys.argv[1:]; solve_csv.main(); " \
+               "print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, file=sys.stderr)"
+
+
+def run_c(binary, puzzles, directory):
+    """
+    Solves puzzles one at a time with the C binary, writing puzzle.csv and reading answer.csv for each, and returns the seconds taken.
+    """
+    start = time.perf_counter()
+    for puzzle in puzzles:
+        with open(os.path.join(directory, "puzzle.csv"), "w") as f:
+            write_answers(f, [puzzle], True)
+        subprocess.run([binary], cwd=directory, check=True, timeout=60)
+        with open(os.path.join(directory, "answer.csv")) as f:
+            assert check_boards(list(read_csv(f))).complete.all()
+    return time.perf_counter() - start
+
+
+def run_python(paths, out, chunkSize, directory):
+    """
+    Runs solve_csv.py on paths and returns (seconds, peak memory in KiB, stderr lines).
+    """
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-c", MEASURED_RUN, "solve_csv.py", *paths, "--out", out, "--chunk-size", str(chunkSize)],
+                            cwd=ROOT, check=True, capture_output=True, text=True)
+    seconds = time.perf_counter() - start
+    lines = result.stderr.strip().splitlines()
+    return seconds, int(lines[-1]), lines[:-1]
+
+
+def main():
+    random.seed(0)
+    seeds = list(generate_many(2, 200, seed=0))
+    puzzles = [puzzle for puzzle, _ in derive_puzzles(seeds, PUZZLES, random.Random(0))]
+    directory = tempfile.mkdtemp()
+    try:
+        inputs = os.path.join(directory, "puzzles")
+        os.makedirs(inputs)
+        perFile = PUZZLES // FILES
+        # Files are written the way the C version writes them, without a trailing newline, and joined like cat would
+        concatenated = os.path.join(directory, "all.csv")
+        with open(concatenated, "w") as joined:
+            for i in range(FILES):
+                with open(os.path.join(inputs, f"puzzles{i}.csv"), "w") as f:
+                    write_answers(f, puzzles[i * perFile:(i + 1) * perFile], True)
+                with open(os.path.join(inputs, f"puzzles{i}.csv")) as f:
+                    joined.write(f.read())
+
+        binary = os.path.join(directory, "sudoku")
+        # sudoku.cpp calls std::find without including <algorithm>, which newer compilers no longer pull in through other headers
+        if shutil.which("g++") and subprocess.run(["g++", "-O2", "-include", "algorithm", "-o", binary, C_SOURCE]).returncode == 0:
+            seconds = run_c(binary, puzzles[:C_PUZZLES], directory)
+            print(f"C binary, one grid per run           {C_PUZZLES / seconds:9.1f} puzzles/s")
+        else:
+            print("C binary skipped, it could not be built")
+
+        for chunkSize in CHUNK_SIZES:
+            answers = os.path.join(directory, "answer.csv")
+            seconds, peak, _ = run_python([concatenated], answers, chunkSize, directory)
+            with open(answers) as f:
+                assert check_boards(list(read_csv(f))).complete.all()
+            print(f"solve_csv, one file, chunks of {chunkSize:<6} {PUZZLES / seconds:9.1f} puzzles/s   peak memory {peak / 1024:6.1f} MiB")
+
+        seconds, peak, lines = run_python([inputs], os.path.join(directory, "answers"), CHUNK_SIZES[1], directory)
+        print(f"solve_csv, directory of {FILES} files      {PUZZLES / seconds:9.1f} puzzles/s   peak memory {peak / 1024:6.1f} MiB")
+        for line in lines:
+            print("    " + line.replace(inputs + os.sep, ""))
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
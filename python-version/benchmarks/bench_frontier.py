@@ -0,0 +1,97 @@
+import copy
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+from generate import generate_puzzle
+from helper import SolverStats, StackFrontier
+from sudoku import available, change_state, solve_backtrack
+
+
+class SlicingFrontier(StackFrontier):
+    """
+    The frontier as it was before, copying the rest of the list on every remove.
+    """
+
+    def remove(self):
+        node = self.frontier[-1]
+        self.frontier = self.frontier[:-1]
+        return node
+
+
+def count_legacy(puzzle):
+    """
+    Counts every solution the way solve_backtrack did before, with a deepcopy of the grid for every push.
+    """
+    counter = 0
+    frontier = SlicingFrontier()
+    options = available(puzzle)
+    for option in options[0]:
+        frontier.add(change_state(copy.deepcopy(puzzle), options[1], option))
+    while not frontier.empty():
+        puzzle = frontier.remove()
+        options = available(puzzle)
+        for option in options[0]:
+            frontier.add(change_state(copy.deepcopy(puzzle), options[1], option))
+        if options[1] is None:
+            counter += 1
+    return counter
+
+
+def count_current(puzzle):
+    """
+    Counts every solution with solve_backtrack.
+    """
+    return solve_backtrack(puzzle, True)
+
+
+def count_pushes(puzzles):
+    """
+    Returns the number of states pushed while counting every solution, the same for both versions since they search in the same order.
+    Counting runs until the frontier is empty, so every pushed state is popped once and nodes equals pushes.
+    """
+    stats = SolverStats()
+    for puzzle in puzzles:
+        solve_backtrack(puzzle, True, stats)
+    return stats.nodes
+
+
+def measure(count, puzzles):
+    """
+    Returns (solutions, seconds, peak bytes) for counting every solution of every puzzle.
+    Time is measured without tracemalloc, which slows allocation down, and peak memory in a second run with it.
+    """
+    start = time.perf_counter()
+    solutions = sum(count(puzzle) for puzzle in puzzles)
+    seconds = time.perf_counter() - start
+
+    peak = 0
+    for puzzle in puzzles:
+        tracemalloc.start()
+        count(puzzle)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return solutions, seconds, peak
+
+
+def main():
+    random.seed(0)
+    puzzles = [generate_puzzle(0)[0] for _ in range(5)]
+    # Removing numbers gives puzzles with many solutions, so counting them keeps a deep and wide frontier
+    for puzzle in puzzles:
+        for _ in range(6):
+            puzzle[random.randrange(9)][random.randrange(9)] = 0
+
+    pushes = count_pushes(puzzles)
+    for name, count in (("slicing + deepcopy", count_legacy), ("pop + bytearray", count_current)):
+        solutions, seconds, peak = measure(count, puzzles)
+        print(f"{name:<20} {solutions:>6} solutions {pushes:>8} pushes {pushes / seconds:>10.0f} pushes/s {seconds:8.3f}s  peak {peak / 1024:8.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+import os
+import random
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+import generate
+from sudoku import has_unique_solution, solve
+
+PUZZLES = 10
+NAMES = ["easy", "medium", "hard", "evil"]
+
+
+def count_everything(puzzle):
+    """
+    Uniqueness check used before count_solutions, which counts every solution before comparing.
+    """
+    return solve(puzzle, True) == 1
+
+
+def time_generation(difficulty, check):
+    """
+    Returns the seconds it takes to generate PUZZLES puzzles of a difficulty with check as the uniqueness test.
+    """
+    generate.has_unique_solution = check
+    random.seed(difficulty)
+    start = time.perf_counter()
+    for _ in range(PUZZLES):
+        generate.generate_puzzle(difficulty)
+    return time.perf_counter() - start
+
+
+def main():
+    for difficulty in generate.DIFFICULTIES:
+        before = time_generation(difficulty, count_everything)
+        after = time_generation(difficulty, has_unique_solution)
+        print(f"{NAMES[difficulty]:<7} {PUZZLES} puzzles   count all {before:8.3f}s   stop at 2 {after:8.3f}s   speedup {before / after:6.1f}x")
+    generate.has_unique_solution = has_unique_solution
+
+
+if __name__ == "__main__":
+    main()
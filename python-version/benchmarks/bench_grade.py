@@ -0,0 +1,39 @@
+import os
+import random
+import sys
+import time
+from collections import Counter
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+from generate import DIFFICULTIES, generate_graded, generate_puzzle
+from grade import GRADES, grade
+from helper import SolverStats
+
+COUNT = 30
+
+
+def main():
+    random.seed(0)
+    # How hard the hole-count difficulties really are, and how long grading one candidate takes
+    for difficulty in DIFFICULTIES:
+        puzzles = [generate_puzzle(difficulty)[0] for _ in range(COUNT)]
+        start = time.perf_counter()
+        grades = [grade(puzzle) for puzzle in puzzles]
+        seconds = time.perf_counter() - start
+        techniques = Counter(result.technique for result in grades)
+        print(f"difficulty {difficulty}  {seconds / COUNT * 1000:6.2f} ms per grade   {dict(techniques)}")
+
+    # Puzzles per second when targeting every band of scores
+    for level, band in GRADES.items():
+        stats = SolverStats()
+        start = time.perf_counter()
+        puzzles = [generate_graded(level, stats)[0] for _ in range(COUNT)]
+        seconds = time.perf_counter() - start
+        scores = Counter(grade(puzzle).score for puzzle in puzzles)
+        print(f"grade {level} {str(band):<12} {COUNT / seconds:6.1f} puzzles/s   {stats.restarts:3} restarts   scores {dict(scores)}")
+
+
+if __name__ == "__main__":
+    main()
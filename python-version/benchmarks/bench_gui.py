@@ -0,0 +1,68 @@
+import itertools
+import os
+import random
+import sys
+import time
+
+# Draw into an off-screen window so the benchmark runs without a display
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+import pygame
+
+import GUI
+from generate import generate_puzzle
+
+REPEATS = 2000
+
+
+def scan_select(mouse):
+    """
+    Hit test used before the geometry table, which builds and checks a rect for all 81 boxes.
+    """
+    selected = None
+    for box_x in range(GUI.FIELDSIZE):
+        for box_y in range(GUI.FIELDSIZE):
+            left, top = GUI.get_box_placement(box_x, box_y)
+            if pygame.Rect(left, top, GUI.BOXSIZE, GUI.BOXSIZE).collidepoint(mouse):
+                selected = (box_x, box_y)
+    return selected
+
+
+def per_call(function, repeats=REPEATS):
+    """
+    Returns the average microseconds per call of function.
+    """
+    start = time.perf_counter()
+    for _ in range(repeats):
+        function()
+    return (time.perf_counter() - start) / repeats * 1e6
+
+
+def main():
+    random.seed(0)
+    puzzle, solved = generate_puzzle(0)
+    board = GUI.Board(puzzle, solved)
+    clicks = [(random.randrange(GUI.WIDTH), random.randrange(GUI.HEIGHT)) for _ in range(REPEATS)]
+
+    def full_frame():
+        board.redraw()
+        board.draw_board()
+
+    def select_frame():
+        board.selected = (random.randrange(GUI.FIELDSIZE), random.randrange(GUI.FIELDSIZE))
+        board.draw_board()
+
+    clickCycle = itertools.cycle(clicks)
+
+    print(f"full board draw     {per_call(full_frame, 200):9.1f} us")
+    print(f"idle frame          {per_call(board.draw_board):9.1f} us")
+    print(f"selection change    {per_call(select_frame):9.1f} us")
+    print(f"click (81-box scan) {per_call(lambda: scan_select(next(clickCycle))):9.1f} us")
+    print(f"click (lookup)      {per_call(lambda: board.select_square(next(clickCycle))):9.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+import GUI
+from generate import generate_puzzle
+from hints import Candidates
+
+
+def replay(puzzle, solved, rebuild):
+    """
+    Plays a whole game on a Board, making one wrong guess and deleting it before every correct number, and asking for notes and a hint after every keystroke.
+    If rebuild is True, candidates are rebuilt from the whole puzzle before every request, like re-running available() would.
+    Returns the number of keystrokes and the seconds spent.
+    """
+    board = GUI.Board([row[:] for row in puzzle], solved)
+    empty = [(x, y) for x in range(GUI.FIELDSIZE) for y in range(GUI.FIELDSIZE) if not puzzle[x][y]]
+    keystrokes = 0
+    start = time.perf_counter()
+    for x, y in empty:
+        right = solved[x][y]
+        for action in ("wrong", "delete", "right"):
+            board.selected = (x, y)
+            if action == "wrong":
+                board.draw_number(right % 9 + 1, 0)
+            elif action == "delete":
+                board.delete_number()
+            else:
+                board.draw_number(right, 0)
+            if rebuild:
+                board.candidates = Candidates(board.puzzle, solved)
+            board.fill_notes()
+            board.candidates.next_step()
+            keystrokes += 1
+    return keystrokes, time.perf_counter() - start
+
+
+def wrong_hints(games):
+    """
+    Plays games with one wrong number left in a random empty space and returns how many (hints, notes) were wrong:
+    a hint whose number is not the solution's, or notes that leave out the solution's number.
+    """
+    hints = notes = 0
+    for _ in range(games):
+        puzzle, solved = generate_puzzle(random.randrange(4))
+        board = GUI.Board([row[:] for row in puzzle], solved)
+        x, y = random.choice([(x, y) for x in range(GUI.FIELDSIZE) for y in range(GUI.FIELDSIZE) if not puzzle[x][y]])
+        board.selected = (x, y)
+        board.draw_number(random.choice([n for n in range(1, 10) if n != solved[x][y]]), 0)
+        step = board.show_hint()
+        if step is not None and step[1] != solved[step[0] // GUI.FIELDSIZE][step[0] % GUI.FIELDSIZE]:
+            hints += 1
+        board.fill_notes()
+        if any(not board.notes[x * GUI.FIELDSIZE + y] & (1 << solved[x][y])
+               for x in range(GUI.FIELDSIZE) for y in range(GUI.FIELDSIZE) if not board.puzzle[x][y]):
+            notes += 1
+    return hints, notes
+
+
+def main():
+    random.seed(0)
+    games = 190
+    hints, notes = wrong_hints(games)
+    print(f"{games} games with a wrong number: {hints} wrong hints, {notes} games with notes missing the right number")
+    for difficulty in (0, 3):
+        puzzle, solved = generate_puzzle(difficulty)
+        for rebuild, label in ((True, "rebuild"), (False, "incremental")):
+            keystrokes, seconds = replay(puzzle, solved, rebuild)
+            print(f"difficulty {difficulty} {label:<12} {keystrokes} keystrokes   {seconds / keystrokes * 1e6:8.1f} us per keystroke (notes + hint)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+import os
+import random
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+from bench_solver import PUZZLE_CSV, read_csv_puzzle
+from engine import Search
+from generate import generate_puzzle
+
+
+def run(puzzle, propagate):
+    """
+    Counts every solution of puzzle and returns the finished Search along with the seconds it took.
+    """
+    search = Search(puzzle, propagate)
+    start = time.perf_counter()
+    for _ in search.solutions():
+        pass
+    return search, time.perf_counter() - start
+
+
+def compare(name, puzzles):
+    """
+    Prints the nodes, forced singles and time used by the first-empty and propagating searches over puzzles.
+    """
+    for propagate, label in ((False, "first-empty"), (True, "propagate+MRV")):
+        nodes = forced = seconds = 0
+        for puzzle in puzzles:
+            search, elapsed = run(puzzle, propagate)
+            nodes += search.nodes
+            forced += search.forced
+            seconds += elapsed
+        print(f"{name:<14} {label:<14} nodes {nodes:>9}   forced {forced:>7}   {seconds:8.4f}s")
+
+
+def main():
+    random.seed(4)
+    evil = [generate_puzzle(3)[0] for _ in range(5)]
+
+    compare("puzzle.csv", [read_csv_puzzle(PUZZLE_CSV)])
+    compare("5 evil", evil)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+import requests
+from bs4 import BeautifulSoup as bs
+
+from corpus import Corpus, write_corpus
+from generate import generate_puzzle
+from puzzle_scraper import LEVELS, PageCache, harvest, with_solutions
+
+PAGES = 20
+COUNT = 100
+# Seconds the stand-in server waits before answering, like a round trip to the real site
+LATENCY = 0.02
+
+
+def websudoku_page(puzzle):
+    """
+    Returns a page laid out like a websudoku puzzle page, with the puzzle_grid table surrounded by filler the size of the real page.
+    """
+    rows = []
+    for r, row in enumerate(puzzle):
+        cells = []
+        for c, value in enumerate(row):
+            if value:
+                tag = f'<INPUT CLASS=s0 SIZE=2 AUTOCOMPLETE=off NAME=8O12 READONLY VALUE="{value}" ID="f{c}{r}">'
+            else:
+                tag = f'<INPUT CLASS=d0 SIZE=2 AUTOCOMPLETE=off NAME=8O12 ID="f{c}{r}" onBlur="j8(this)">'
+            cells.append(f'<TD CLASS=g0 ID="c{c}{r}">{tag}</TD>')
+        rows.append("<TR>" + "".join(cells) + "</TR>")
+    filler = "".join(f'<div class="ad" id="a{i}"><a href="/link{i}">Link {i}</a><p>Some text for paragraph {i}.</p></div>' for i in range(300))
+    return (f"<html><head><title>Web Sudoku</title></head><body>{filler}<form><TABLE ID=\"puzzle_grid\" CELLSPACING=0 CELLPADDING=0 CLASS=t>"
+            + "".join(rows) + f"</TABLE></form>{filler}</body></html>")
+
+
+def serve(pages):
+    """
+    Starts a local stand-in for websudoku in a thread that answers ?level=L&set_id=N with saved page N, and returns (server, site).
+    """
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            query = parse_qs(urlparse(self.path).query)
+            page = pages[int(query.get("set_id", ["0"])[0]) % len(pages)].encode()
+            time.sleep(LATENCY)
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html")
+            self.send_header("Content-Length", str(len(page)))
+            self.end_headers()
+            self.wfile.write(page)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/?level="
+
+
+def legacy_get_puzzle(site, level):
+    """
+    The scraper as it was before: a new connection per puzzle and BeautifulSoup with lxml over the whole page.
+    """
+    siteHTML = bs(requests.get(site + level).text, 'lxml')
+    puzzle = []
+    for row in siteHTML.find("table", {'id': "puzzle_grid"}).find_all('tr'):
+        newRow = []
+        for value in row.find_all('td'):
+            try:
+                newRow.append(int(value.find("input").attrs['value']))
+            except KeyError:
+                newRow.append(0)
+        puzzle.append(newRow)
+    return puzzle
+
+
+def main():
+    random.seed(0)
+    saved = [generate_puzzle(random.randrange(4))[0] for _ in range(PAGES)]
+    server, site = serve([websudoku_page(puzzle) for puzzle in saved])
+    setIds = range(COUNT)
+    expected = [saved[setId % PAGES] for setId in setIds]
+
+    start = time.perf_counter()
+    puzzles = [legacy_get_puzzle(site, f"1&set_id={setId}") for setId in setIds]
+    seconds = time.perf_counter() - start
+    assert puzzles == expected
+    print(f"{'requests.get + bs4':<28} {COUNT / seconds:8.1f} puzzles/s")
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache = PageCache(directory)
+        for label in ("pooled, 8 threads, cold", "pooled, 8 threads, cached"):
+            start = time.perf_counter()
+            puzzles = [puzzle for _, puzzle in harvest(site, "1", setIds, 8, cache=cache)]
+            seconds = time.perf_counter() - start
+            assert puzzles == expected
+            print(f"{label:<28} {COUNT / seconds:8.1f} puzzles/s")
+        print(f"{len(os.listdir(os.path.join(directory, 'pages')))} distinct pages cached for {COUNT} URLs")
+
+        # Stream every level into a corpus file from the warm cache
+        path = os.path.join(directory, "scraped.corpus")
+        start = time.perf_counter()
+        levels = {difficulty: with_solutions(p for _, p in harvest(site, level, setIds, 8, cache=cache)) for level, difficulty in LEVELS.items()}
+        counts = write_corpus(path, levels)
+        seconds = time.perf_counter() - start
+        with Corpus(path) as corpus:
+            assert corpus.get(0, 3)[0] == expected[3]
+        print(f"{sum(counts.values())} puzzles harvested into a corpus in {seconds:.2f}s")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path.insert(0, ROOT)
+
+from codec import read_lines, to_line
+from generate import generate_puzzle
+
+HARD_FILE = os.path.join(HERE, "hard.txt")
+REQUESTS = 2000
+# Requests solved by starting a new interpreter each, the way scripts were called before
+SHELL_REQUESTS = 20
+
+
+def make_requests(count):
+    """
+    Returns a mixed list of count solve, validate and generate requests, with a few known-hard puzzles solved by the row-major
+    search, which takes seconds on them, so they hit a short timeout.
+    """
+    random.seed(0)
+    puzzles = [to_line(generate_puzzle(random.randrange(4))[0]) for _ in range(50)]
+    with open(HARD_FILE) as f:
+        hard = [to_line(puzzle) for puzzle in read_lines(f)]
+
+    requests = []
+    for i in range(count):
+        kind = random.random()
+        if kind < 0.6:
+            requests.append({"id": i, "op": "solve", "puzzle": random.choice(puzzles)})
+        elif kind < 0.9:
+            requests.append({"id": i, "op": "validate", "puzzle": random.choice(puzzles)})
+        elif kind < 0.995:
+            requests.append({"id": i, "op": "generate", "difficulty": random.randrange(4)})
+        else:
+            requests.append({"id": i, "op": "solve", "puzzle": random.choice(hard), "backend": "bitmask", "timeout": 0.5})
+    return requests
+
+
+def run_service(requests, workers):
+    """
+    Sends every request to a service process through a pipe as fast as it takes them and returns (seconds, latencies by id,
+    responses, the service's own metrics). Requests pile up in the pipe, so most of the latency is time spent waiting in line.
+    """
+    process = subprocess.Popen([sys.executable, "service.py", "--workers", str(workers)], cwd=ROOT, text=True,
+                               stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    sent = dict()
+
+    def write():
+        for request in requests:
+            sent[request["id"]] = time.perf_counter()
+            process.stdin.write(json.dumps(request) + "\n")
+            process.stdin.flush()
+        process.stdin.close()
+
+    start = time.perf_counter()
+    writer = threading.Thread(target=write)
+    writer.start()
+    latencies = dict()
+    responses = []
+    for line in process.stdout:
+        response = json.loads(line)
+        latencies[response["id"]] = time.perf_counter() - sent[response["id"]]
+        responses.append(response)
+    seconds = time.perf_counter() - start
+    writer.join()
+    metrics = json.loads(process.stderr.read().strip().splitlines()[-1])
+    process.wait()
+    return seconds, latencies, responses, metrics
+
+
+def run_one_at_a_time(requests):
+    """
+    Sends requests to a service process one at a time, waiting for each response, and returns the latency of each in seconds.
+    """
+    process = subprocess.Popen([sys.executable, "service.py", "--workers", "1"], cwd=ROOT, text=True,
+                               stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    latencies = []
+    for request in requests:
+        start = time.perf_counter()
+        process.stdin.write(json.dumps(request) + "\n")
+        process.stdin.flush()
+        process.stdout.readline()
+        latencies.append(time.perf_counter() - start)
+    process.stdin.close()
+    process.wait()
+    return latencies
+
+
+def run_shell(requests):
+    """
+    Solves requests by starting a new interpreter for each one and returns the seconds taken.
+    """
+    start = time.perf_counter()
+    for request in requests:
+        code = f"from codec import from_line; from sudoku import solve; solve(from_line({request['puzzle']!r}), False, True)"
+        subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True)
+    return time.perf_counter() - start
+
+
+def main():
+    requests = make_requests(REQUESTS)
+    solves = [request for request in requests if request["op"] == "solve" and "backend" not in request][:SHELL_REQUESTS]
+    seconds = run_shell(solves)
+    print(f"one interpreter per solve   {len(solves) / seconds:8.1f} requests/s")
+    samples = sorted(run_one_at_a_time(solves * 10))
+    print(f"service, one at a time      {len(samples) / sum(samples):8.1f} requests/s   client p50 {samples[len(samples) // 2] * 1000:7.1f} ms")
+
+    for workers in (1, 2, 4):
+        seconds, latencies, responses, metrics = run_service(requests, workers)
+        assert len(responses) == len(requests)
+        samples = sorted(latencies.values())
+        p50, p99 = samples[len(samples) // 2] * 1000, samples[int(len(samples) * 0.99)] * 1000
+        print(f"service, {workers} workers          {len(requests) / seconds:8.1f} requests/s   client p50 {p50:7.1f} ms   p99 {p99:7.1f} ms   "
+              f"{metrics['timeouts']} timeouts   {metrics['errors']} errors   {metrics['requestsPerBatch']:.1f} requests per batch")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+import os
+import random
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+from generate import SIZED_HOLES, generate_sized
+from helper import SolverStats
+from sudoku import count_solutions, solve
+from validate import check_boards
+
+COUNT = 10
+
+
+def main():
+    random.seed(0)
+    for box, holes in SIZED_HOLES.items():
+        size = box * box
+        stats = SolverStats()
+        start = time.perf_counter()
+        generated = [generate_sized(box, holes, stats) for _ in range(COUNT)]
+        generateSeconds = (time.perf_counter() - start) / COUNT
+
+        # Solve, prove unique and validate the generated puzzles
+        start = time.perf_counter()
+        for puzzle, solution in generated:
+            assert solve(puzzle, False, True) == solution
+        solveSeconds = (time.perf_counter() - start) / COUNT
+        start = time.perf_counter()
+        for puzzle, _ in generated:
+            assert count_solutions(puzzle, 2) == 1
+        uniqueSeconds = (time.perf_counter() - start) / COUNT
+        start = time.perf_counter()
+        assert check_boards([solution for _, solution in generated]).valid.all()
+        validateSeconds = (time.perf_counter() - start) / COUNT
+
+        print(f"{size}x{size} ({holes} holes)   generate {generateSeconds * 1000:9.1f} ms   solve {solveSeconds * 1000:8.2f} ms   "
+              f"unique {uniqueSeconds * 1000:8.2f} ms   validate {validateSeconds * 1e6:7.1f} us   "
+              f"{stats.nodes / COUNT:7.0f} guesses per puzzle generated")
+
+    # An empty 25x25 grid was out of reach for the original backtracker, which copies all 625 spaces for every node
+    start = time.perf_counter()
+    solve([[0] * 25 for _ in range(25)], False, True)
+    print(f"empty 25x25 grid filled in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
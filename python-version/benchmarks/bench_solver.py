@@ -0,0 +1,55 @@
+import os
+import random
+import sys
+import time
+
+# Benchmarks are run from the benchmarks folder, so make the solver modules importable
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+from codec import read_csv
+from generate import generate_puzzle
+from sudoku import solve, solve_backtrack
+
+PUZZLE_CSV = os.path.join(HERE, "..", "..", "c-version", "puzzle.csv")
+
+
+def read_csv_puzzle(path):
+    """
+    Reads the first puzzle in a file in the comma-separated format used by the C version.
+    """
+    with open(path) as f:
+        return next(read_csv(f))
+
+
+def time_call(function, puzzle, numEndings):
+    """
+    Returns the number of seconds it takes for function to solve puzzle.
+    """
+    start = time.perf_counter()
+    function(puzzle, numEndings)
+    return time.perf_counter() - start
+
+
+def compare(name, puzzles, numEndings):
+    """
+    Times solve_backtrack and solve on every puzzle in puzzles and prints the totals and speedup.
+    """
+    old = sum(time_call(solve_backtrack, puzzle, numEndings) for puzzle in puzzles)
+    new = sum(time_call(solve, puzzle, numEndings) for puzzle in puzzles)
+    print(f"{name:<28} backtrack {old:9.4f}s   bitmask {new:9.4f}s   speedup {old / new:7.1f}x")
+
+
+def main():
+    random.seed(4)
+    csvPuzzle = read_csv_puzzle(PUZZLE_CSV)
+    evil = [generate_puzzle(3)[0] for _ in range(5)]
+
+    compare("puzzle.csv (first solution)", [csvPuzzle], False)
+    compare("puzzle.csv (count)", [csvPuzzle], True)
+    compare("5 evil (first solution)", evil, False)
+    compare("5 evil (count)", evil, True)
+
+
+if __name__ == "__main__":
+    main()
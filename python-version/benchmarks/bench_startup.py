@@ -0,0 +1,42 @@
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+RUNS = 15
+
+# Every case is run in a fresh interpreter, so module imports and pygame setup are measured cold
+CASES = {
+    "python -c pass": ["-c", "pass"],
+    "import sudoku": ["-c", "import sudoku"],
+    "import generate": ["-c", "import generate"],
+    "core imports without pygame": ["-c", "import sys, sudoku, generate, corpus, codec, grade, hints; assert 'pygame' not in sys.modules"],
+    "generate.py --count 1": ["generate.py", "--count", "1", "--workers", "1"],
+    "import GUI": ["-c", "import GUI"],
+    "GUI start page drawn": ["-c", "import GUI; GUI.init(); GUI.start_page(); GUI.pygame.display.flip()"],
+}
+
+
+def cold_start(args):
+    """
+    Returns the median wall time in seconds of running python with args from the python-version directory.
+    """
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy", PYGAME_HIDE_SUPPORT_PROMPT="1")
+    samples = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + args, cwd=ROOT, env=env, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main():
+    for name, args in CASES.items():
+        print(f"{name:<30} {cold_start(args) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import os
+import random
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+import numpy as np
+
+from generate import generate_many
+from sudoku import check_mini_grid, check_row_or_column
+from validate import check_boards
+
+BOARDS = 2000
+
+
+def loop_check(board):
+    """
+    Checks one board with the existing list helpers and returns (valid, conflicts), where conflicts is a set of spaces.
+    """
+    conflicts = set()
+    for row in range(9):
+        for column in range(9):
+            value = board[row][column]
+            if not value:
+                continue
+            columnValues = [board[i][column] for i in range(9)]
+            if (check_row_or_column(board[row]).count(value) > 1 or check_row_or_column(columnValues).count(value) > 1
+                    or check_mini_grid(board, (row, column)).count(value) > 1):
+                conflicts.add((row, column))
+    return not conflicts, conflicts
+
+
+def main():
+    random.seed(0)
+    # Half of the boards are solutions with one space changed, so some of them break the rules
+    boards = []
+    for _, solution in generate_many(0, BOARDS // 10, workers=1):
+        for _ in range(10):
+            board = [row[:] for row in solution]
+            if random.random() < 0.5:
+                board[random.randrange(9)][random.randrange(9)] = random.randint(0, 9)
+            boards.append(board)
+
+    start = time.perf_counter()
+    looped = [loop_check(board) for board in boards]
+    loopTime = time.perf_counter() - start
+
+    array = np.array(boards, dtype=np.uint8)
+    start = time.perf_counter()
+    result = check_boards(array)
+    vectorTime = time.perf_counter() - start
+
+    # Both methods must agree before their times mean anything
+    conflicts = result.rows | result.columns | result.boxes
+    for i, (valid, spaces) in enumerate(looped):
+        assert valid == result.valid[i]
+        assert spaces == set(zip(*np.nonzero(conflicts[i])))
+
+    print(f"{len(boards)} boards   loop {loopTime:8.4f}s   numpy {vectorTime:8.4f}s   speedup {loopTime / vectorTime:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+# GUI timings draw into an off-screen window so the suite runs without a display
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+from codec import from_line, pack, read_csv, read_lines, to_line, unpack
+from generate import DIFFICULTIES, generate_puzzle
+from sudoku import has_unique_solution, solve
+
+HARD_FILE = os.path.join(HERE, "hard.txt")
+PUZZLE_CSV = os.path.join(HERE, "..", "..", "c-version", "puzzle.csv")
+RESULTS_DIR = os.path.join(HERE, "results")
+SEED = 2024
+
+
+def percentiles(samples):
+    """
+    Returns a dictionary of summary statistics, in milliseconds, for a list of timings in seconds.
+    """
+    samples = sorted(samples)
+
+    def at(fraction):
+        return samples[min(len(samples) - 1, int(fraction * len(samples)))] * 1000
+
+    return {
+        "count": len(samples),
+        "mean_ms": sum(samples) / len(samples) * 1000,
+        "p50_ms": at(0.5),
+        "p90_ms": at(0.9),
+        "p99_ms": at(0.99),
+        "max_ms": samples[-1] * 1000,
+    }
+
+
+def timings(function, items):
+    """
+    Calls function on every item and returns the seconds each call took.
+    """
+    result = []
+    for item in items:
+        start = time.perf_counter()
+        function(item)
+        result.append(time.perf_counter() - start)
+    return result
+
+
+def seed_corpus(perDifficulty):
+    """
+    Returns the fixed benchmark corpus as a dictionary relating a name to a list of puzzles.
+    Generated puzzles come from SEED, so every run solves the same grids.
+    """
+    random.seed(SEED)
+    with open(PUZZLE_CSV) as f:
+        corpus = {"puzzle.csv": list(read_csv(f))}
+    with open(HARD_FILE) as f:
+        corpus["hard"] = list(read_lines(f))
+    for difficulty in DIFFICULTIES:
+        corpus[f"generated-{difficulty}"] = [generate_puzzle(difficulty)[0] for _ in range(perDifficulty)]
+    return corpus
+
+
+def bench_solve(corpus):
+    """
+    Solve latency for every part of the corpus, with and without propagation.
+    The known-hard puzzles are only solved with propagation since the row-major search takes seconds on them.
+    """
+    results = {}
+    for name, puzzles in corpus.items():
+        results[f"{name}/propagate"] = percentiles(timings(lambda puzzle: solve(puzzle, False, True), puzzles))
+        if name != "hard":
+            results[f"{name}/first-empty"] = percentiles(timings(lambda puzzle: solve(puzzle, False), puzzles))
+    return results
+
+
+def bench_unique(corpus):
+    """
+    Cost of the uniqueness check that generate_puzzle runs after every removal.
+    """
+    return {name: percentiles(timings(has_unique_solution, puzzles)) for name, puzzles in corpus.items()}
+
+
+def bench_generate(count):
+    """
+    Puzzles generated per second for every difficulty.
+    """
+    results = {}
+    for difficulty in DIFFICULTIES:
+        random.seed(SEED + difficulty)
+        samples = timings(generate_puzzle, [difficulty] * count)
+        results[str(difficulty)] = dict(percentiles(samples), puzzles_per_s=count / sum(samples))
+    return results
+
+
+def bench_codec(corpus):
+    """
+    Codec round trips per second over every puzzle in the corpus.
+    """
+    puzzles = [puzzle for group in corpus.values() for puzzle in group] * 50
+    results = {}
+    for name, encode, decode in (("line", to_line, from_line), ("packed", pack, unpack)):
+        start = time.perf_counter()
+        for puzzle in puzzles:
+            decode(encode(puzzle))
+        results[name] = {"round_trips_per_s": len(puzzles) / (time.perf_counter() - start)}
+    return results
+
+
+def bench_gui(corpus):
+    """
+    Board draw times with the SDL dummy video driver: a full board, an idle frame and a frame after one box changed.
+    """
+    import GUI
+
+    puzzles = corpus["generated-0"]
+    full, idle, selection = [], [], []
+    for puzzle in puzzles:
+        board = GUI.Board([row[:] for row in puzzle], solve(puzzle, False, True))
+        for _ in range(20):
+            board.redraw()
+            full += timings(lambda _: board.draw_board(), [None])
+            idle += timings(lambda _: board.draw_board(), [None])
+            board.selected = (random.randrange(GUI.FIELDSIZE), random.randrange(GUI.FIELDSIZE))
+            selection += timings(lambda _: board.draw_board(), [None])
+    return {"full": percentiles(full), "idle": percentiles(idle), "one_box": percentiles(selection)}
+
+
+def compare(old, new, path=()):
+    """
+    Prints every millisecond or per-second figure that differs between two result dictionaries, as a percentage change.
+    """
+    for key, value in new.items():
+        if isinstance(value, dict):
+            compare(old.get(key, {}), value, path + (key,))
+        elif key.endswith("_ms") or key.endswith("_per_s"):
+            if key in old and old[key]:
+                change = (value - old[key]) / old[key] * 100
+                print(f"{'/'.join(path + (key,)):<50} {old[key]:12.3f} -> {value:12.3f}  {change:+7.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the solver, generator, codec and GUI benchmarks and save the results as JSON.")
+    parser.add_argument("--puzzles", type=int, default=20, help="generated puzzles per difficulty in the seed corpus")
+    parser.add_argument("--generate", type=int, default=20, help="puzzles to generate per difficulty for throughput")
+    parser.add_argument("--skip", nargs="*", default=[], choices=["solve", "unique", "generate", "codec", "gui"])
+    parser.add_argument("--out", default=None, help="results file (default: results/<timestamp>.json)")
+    parser.add_argument("--compare", default=None, help="earlier results file to compare against")
+    args = parser.parse_args()
+
+    corpus = seed_corpus(args.puzzles)
+    results = {
+        "meta": {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "seed": SEED,
+            "puzzles": args.puzzles,
+        }
+    }
+    suites = {
+        "solve": lambda: bench_solve(corpus),
+        "unique": lambda: bench_unique(corpus),
+        "generate": lambda: bench_generate(args.generate),
+        "codec": lambda: bench_codec(corpus),
+        "gui": lambda: bench_gui(corpus),
+    }
+    for name, suite in suites.items():
+        if name not in args.skip:
+            print(f"running {name}...", file=sys.stderr)
+            results[name] = suite()
+
+    out = args.out
+    if out is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        out = os.path.join(RESULTS_DIR, time.strftime("%Y%m%d-%H%M%S") + ".json")
+    with open(out, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"results written to {out}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), results)
+
+
+if __name__ == "__main__":
+    main()
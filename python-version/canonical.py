@@ -0,0 +1,260 @@
+import itertools
+from collections import OrderedDict
+
+from sudoku import count_solutions, make_search, solve
+
+SIZE = 9
+# Number of rounds of color refinement used to order rows and columns before trying the orders that are still tied
+ROUNDS = 3
+# Most arrangements canonical_form will try; puzzles with more ties than this (like a nearly empty grid) are not canonicalized
+LIMIT = 5000
+
+
+class Transform():
+    """
+    Class for one sudoku symmetry: an optional transposition, a row order, a column order and a relabeling of digits.
+    Applying it to a grid gives grid[rows[r]][columns[c]] (transposed first if transpose is True) with every digit relabeled.
+    """
+
+    def __init__(self, transpose, rows, columns, labels):
+        self.transpose = transpose
+        self.rows = rows
+        self.columns = columns
+        # Labels relates every digit 1 to 9 to the digit it becomes
+        self.labels = labels
+        self.inverse = {new: old for old, new in labels.items()}
+
+    def apply(self, grid):
+        """
+        Returns the grid with this transform applied.
+        """
+        if self.transpose:
+            grid = [list(column) for column in zip(*grid)]
+        return [[self.labels.get(grid[row][column], 0) for column in self.columns] for row in self.rows]
+
+    def undo(self, grid):
+        """
+        Returns the grid with this transform reversed, so undo(apply(grid)) == grid.
+        """
+        result = [[0] * SIZE for _ in range(SIZE)]
+        for r, row in enumerate(self.rows):
+            for c, column in enumerate(self.columns):
+                result[row][column] = self.inverse.get(grid[r][c], 0)
+        if self.transpose:
+            result = [list(column) for column in zip(*result)]
+        return result
+
+
+def refine(grids):
+    """
+    Returns (rowColors, columnColors) for each grid in grids, where equal colors mean rows or columns that look the same
+    once rows, columns, bands and stacks are reordered.
+    Colors are ranked over all grids together, so they can be compared between the two orientations of a puzzle.
+    """
+    filled = [[[value != 0 for value in row] for row in grid] for grid in grids]
+    rowColors = [[sum(row) for row in cells] for cells in filled]
+    columnColors = [[sum(column) for column in zip(*cells)] for cells in filled]
+
+    for _ in range(ROUNDS):
+        newRows = []
+        newColumns = []
+        for cells, rows, columns in zip(filled, rowColors, columnColors):
+            bands = [tuple(sorted(rows[band * 3:band * 3 + 3])) for band in range(3)]
+            stacks = [tuple(sorted(columns[stack * 3:stack * 3 + 3])) for stack in range(3)]
+            newRows.append([(bands[r // 3], rows[r], tuple(sorted(columns[c] for c in range(SIZE) if cells[r][c]))) for r in range(SIZE)])
+            newColumns.append([(stacks[c // 3], columns[c], tuple(sorted(rows[r] for r in range(SIZE) if cells[r][c]))) for c in range(SIZE)])
+
+        # Replace every color with its rank so colors stay small
+        ranks = {color: rank for rank, color in enumerate(sorted(set(itertools.chain(*newRows, *newColumns))))}
+        rowColors = [[ranks[color] for color in colors] for colors in newRows]
+        columnColors = [[ranks[color] for color in colors] for colors in newColumns]
+
+    return list(zip(rowColors, columnColors))
+
+
+def tied_orders(items, colors):
+    """
+    Returns every order of items that is sorted by color, trying every order of items whose colors are tied.
+    """
+    groups = [list(group) for _, group in itertools.groupby(sorted(items, key=lambda item: colors[item]), key=lambda item: colors[item])]
+    return [list(itertools.chain(*choice)) for choice in itertools.product(*[list(itertools.permutations(group)) for group in groups])]
+
+
+def line_orders(colors):
+    """
+    Returns every row (or column) order that keeps bands together and is sorted by color, first by band and then inside each band.
+    """
+    bandColors = [tuple(sorted(colors[band * 3:band * 3 + 3])) for band in range(3)]
+    insideBands = [tied_orders(range(band * 3, band * 3 + 3), colors) for band in range(3)]
+    orders = []
+    for bandOrder in tied_orders(range(3), bandColors):
+        for inside in itertools.product(*[insideBands[band] for band in bandOrder]):
+            orders.append(list(itertools.chain(*inside)))
+    return orders
+
+
+def canonical_form(puzzle, limit=LIMIT):
+    """
+    Returns (key, transform) where key is an 81-character string that is the same for every puzzle equivalent to this one
+    under digit relabeling, row and column swaps inside bands and stacks, band and stack swaps and transposition.
+    transform turns the puzzle into the grid written in key. Returns None if more than limit arrangements would have to be tried.
+    """
+    grids = [puzzle, [list(column) for column in zip(*puzzle)]]
+    candidates = []
+    for transpose, (rowColors, columnColors) in enumerate(refine(grids)):
+        candidates.append((bool(transpose), line_orders(rowColors), line_orders(columnColors)))
+    if sum(len(rows) * len(columns) for _, rows, columns in candidates) > limit:
+        return None
+
+    best = None
+    for transpose, rowOrders, columnOrders in candidates:
+        grid = grids[transpose]
+        for rows in rowOrders:
+            for columns in columnOrders:
+                # Relabel digits in the order they are first seen
+                labels = dict()
+                key = []
+                for row in rows:
+                    for column in columns:
+                        value = grid[row][column]
+                        if value:
+                            if value not in labels:
+                                labels[value] = len(labels) + 1
+                            value = labels[value]
+                        key.append(value)
+                if best is None or key < best[0]:
+                    best = (key, transpose, rows, columns, labels)
+
+    key, transpose, rows, columns, labels = best
+    # Digits missing from the puzzle are given the remaining labels in order
+    for digit in range(1, SIZE + 1):
+        if digit not in labels:
+            labels[digit] = len(labels) + 1
+    return "".join(map(str, key)), Transform(transpose, rows, columns, labels)
+
+
+class SolveCache():
+    """
+    Class for a bounded least-recently-used cache of solutions and solution counts, keyed on the canonical form of a puzzle,
+    so a puzzle equivalent to one already seen is answered without searching.
+    canonical_form costs about as much as solving a generated puzzle, so the cache only pays off where equivalent puzzles repeat,
+    like a corpus of puzzles derived from a few seeds, or where puzzles are hard to solve. It cannot help generation, whose
+    uniqueness checks are on grids that differ by one space and so are never equivalent to each other.
+    """
+
+    def __init__(self, maxsize=10000):
+        self.maxsize = maxsize
+        # Dictionary relating a canonical key to a dictionary that may hold "solution" (in canonical form) and "count" and "limit"
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        # Puzzles that had too many ties to canonicalize and were passed straight to the solver
+        self.skipped = 0
+
+    def entry(self, key):
+        """
+        Returns the cache entry for key, creating it and evicting the least recently used entry if needed.
+        """
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            return self.entries[key]
+        self.entries[key] = dict()
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+        return self.entries[key]
+
+    def solve(self, puzzle):
+        """
+        Returns a solution grid for a puzzle like sudoku.solve(puzzle, False), raising an Exception if there is none.
+        """
+        form = canonical_form(puzzle)
+        if form is None:
+            self.skipped += 1
+            return solve(puzzle, False, True)
+
+        key, transform = form
+        entry = self.entry(key)
+        if "solution" in entry:
+            self.hits += 1
+        else:
+            self.misses += 1
+            # Search directly rather than through solve, so only a search that ran out is stored as no solution,
+            # and anything that stops it, like a timeout, is passed on without being cached
+            solution = next(make_search(puzzle, "propagate").solutions(), None)
+            entry["solution"] = None if solution is None else transform.apply(solution)
+
+        if entry["solution"] is None:
+            raise Exception("No solution")
+        return transform.undo(entry["solution"])
+
+    def count_solutions(self, puzzle, limit=2):
+        """
+        Returns the number of solutions for a puzzle like sudoku.count_solutions, stopping at limit.
+        """
+        form = canonical_form(puzzle)
+        if form is None:
+            self.skipped += 1
+            return count_solutions(puzzle, limit)
+
+        entry = self.entry(form[0])
+        if "count" in entry:
+            # A stored count below its limit is exact, otherwise it is only known to be at least the limit
+            exact = entry["limit"] is None or entry["count"] < entry["limit"]
+            if exact or (limit is not None and entry["limit"] >= limit):
+                self.hits += 1
+                return entry["count"] if limit is None else min(entry["count"], limit)
+
+        self.misses += 1
+        entry["count"] = count_solutions(puzzle, limit)
+        entry["limit"] = limit
+        return entry["count"]
+
+    def lookup(self, puzzle, limit=2):
+        """
+        Returns (form, solution, count) for a puzzle whose solution and count up to limit are cached, with the solution mapped back onto
+        the puzzle, or (form, None, None) if they are not, in which case form is passed on to store once the puzzle is solved some other way.
+        form is None for a puzzle with too many ties to canonicalize, which is never cached.
+        """
+        form = canonical_form(puzzle)
+        if form is None:
+            self.skipped += 1
+            return None, None, None
+
+        key, transform = form
+        entry = self.entries.get(key)
+        if entry is not None and "solution" in entry and entry.get("limit") == limit:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            solution = entry["solution"]
+            return form, None if solution is None else transform.undo(solution), entry["count"]
+        self.misses += 1
+        return form, None, None
+
+    def store(self, form, solution, count, limit=2):
+        """
+        Stores the solution (or None if there is none) and solution count up to limit of a puzzle that lookup returned form for.
+        """
+        key, transform = form
+        entry = self.entry(key)
+        entry["solution"] = None if solution is None else transform.apply(solution)
+        entry["count"] = count
+        entry["limit"] = limit
+
+    def has_unique_solution(self, puzzle):
+        """
+        Returns True if a puzzle grid has exactly one solution.
+        """
+        return self.count_solutions(puzzle, 2) == 1
+
+    def stats(self):
+        """
+        Returns a dictionary of hits, misses, skipped puzzles, hit rate and current size.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "skipped": self.skipped,
+            "hitRate": self.hits / lookups if lookups else 0.0,
+            "size": len(self.entries),
+        }
@@ -0,0 +1,120 @@
+SIZE = 9
+CELLS = SIZE * SIZE
+# Two spaces fit in a byte, so a packed puzzle is 41 bytes with the last half byte left as 0
+PACKED_SIZE = (CELLS + 1) // 2
+
+# Characters that may stand for an empty space in the line format
+EMPTY_CHARACTERS = str.maketrans(".", "0")
+# Characters that separate values in the CSV format, which are dropped
+CSV_SEPARATORS = str.maketrans("", "", ", \t\r\n")
+
+
+def to_line(puzzle):
+    """
+    Returns a puzzle grid as a single line of 81 digits, with 0 for empty spaces.
+    """
+    return "".join(str(value) for row in puzzle for value in row)
+
+
+def from_line(line):
+    """
+    Takes a line of 81 digits, where 0 or . is an empty space, and returns the puzzle as a list of lists where each nested list is a row.
+    """
+    line = line.strip().translate(EMPTY_CHARACTERS)
+    if len(line) != CELLS or not line.isdigit():
+        raise ValueError(f"Puzzle line must be {CELLS} digits: {line!r}")
+    values = list(map(int, line))
+    return [values[i:i + SIZE] for i in range(0, CELLS, SIZE)]
+
+
+def pack(puzzle):
+    """
+    Returns a puzzle grid packed into 41 bytes, four bits per space.
+    """
+    # Every value is a single hex digit, so fromhex puts two spaces in each byte
+    return bytes.fromhex(to_line(puzzle) + "0")
+
+
+def unpack(data):
+    """
+    Takes 41 bytes made by pack and returns the puzzle as a list of lists.
+    """
+    if len(data) != PACKED_SIZE:
+        raise ValueError(f"Packed puzzle must be {PACKED_SIZE} bytes, got {len(data)}")
+    return from_line(data.hex()[:CELLS])
+
+
+def read_lines(f):
+    """
+    Generator that yields a puzzle grid for every non-blank line of an open text file in the 81-digit line format.
+    """
+    for line in f:
+        if line.strip():
+            yield from_line(line)
+
+
+def write_lines(f, puzzles):
+    """
+    Writes every puzzle grid from an iterable to an open text file, one 81-digit line each, and returns how many were written.
+    """
+    count = 0
+    for puzzle in puzzles:
+        f.write(to_line(puzzle) + "\n")
+        count += 1
+    return count
+
+
+def read_packed(f):
+    """
+    Generator that yields a puzzle grid for every 41-byte record of an open binary file.
+    """
+    while True:
+        data = f.read(PACKED_SIZE)
+        if not data:
+            return
+        yield unpack(data)
+
+
+def write_packed(f, puzzles):
+    """
+    Writes every puzzle grid from an iterable to an open binary file as 41-byte records and returns how many were written.
+    """
+    count = 0
+    for puzzle in puzzles:
+        f.write(pack(puzzle))
+        count += 1
+    return count
+
+
+def read_csv(f):
+    """
+    Generator that yields a puzzle grid for every 81 values of an open text file in the comma-separated format used by the C version.
+    Like the C version, every digit is one value and commas and whitespace only separate them, so rows do not have to line up:
+    C version files end without a newline, and concatenating them joins the last row of one puzzle with the first row of the next.
+    """
+    values = []
+    count = 0
+    for line in f:
+        digits = line.translate(CSV_SEPARATORS)
+        if not (digits.isascii() and digits.isdigit()) and digits:
+            raise ValueError(f"CSV values must be single digits, in puzzle {count + 1}: {line.strip()!r}")
+        values.extend(map(int, digits))
+        while len(values) >= CELLS:
+            yield [values[i:i + SIZE] for i in range(0, CELLS, SIZE)]
+            del values[:CELLS]
+            count += 1
+
+    if values:
+        raise ValueError(f"CSV puzzle {count + 1} ended after {len(values)} values")
+
+
+def write_csv(f, puzzles):
+    """
+    Writes every puzzle grid from an iterable to an open text file in the comma-separated format used by the C version, and returns how many were written.
+    """
+    count = 0
+    for puzzle in puzzles:
+        for row in puzzle:
+            f.write(", ".join(str(value) for value in row) + "\n")
+        count += 1
+    return count
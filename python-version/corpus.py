@@ -0,0 +1,140 @@
+import argparse
+import mmap
+import os
+import random
+import struct
+import sys
+import time
+
+from codec import PACKED_SIZE, pack, unpack
+from generate import DIFFICULTIES, generate_many
+
+# A corpus file starts with MAGIC, then one (offset, count) header for every difficulty, then the records for each difficulty
+MAGIC = b"SUDOKUC1"
+LEVEL_HEADER = struct.Struct("<QQ")
+HEADER_SIZE = len(MAGIC) + LEVEL_HEADER.size * len(DIFFICULTIES)
+# Every record is a packed puzzle followed by its packed solution
+RECORD_SIZE = PACKED_SIZE * 2
+
+
+def write_corpus(path, levels):
+    """
+    Writes a corpus file and returns a dictionary relating each difficulty to the number of puzzles written for it.
+
+    path -- Path of the corpus file to create\n
+    levels -- Dictionary relating each difficulty to an iterable of (puzzle, solution) tuples, which is streamed to disk\n
+    """
+    counts = {difficulty: 0 for difficulty in DIFFICULTIES}
+    offsets = {difficulty: HEADER_SIZE for difficulty in DIFFICULTIES}
+    # Write next to path and move the finished file into place, so an interrupted run never leaves a half-written corpus behind
+    temporary = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temporary, "wb") as f:
+            # Leave room for the header, which is filled in once the counts are known
+            f.write(bytes(HEADER_SIZE))
+            for difficulty in DIFFICULTIES:
+                offsets[difficulty] = f.tell()
+                for puzzle, solution in levels.get(difficulty, ()):
+                    f.write(pack(puzzle) + pack(solution))
+                    counts[difficulty] += 1
+
+            f.seek(0)
+            f.write(MAGIC)
+            for difficulty in DIFFICULTIES:
+                f.write(LEVEL_HEADER.pack(offsets[difficulty], counts[difficulty]))
+        os.replace(temporary, path)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
+    return counts
+
+
+class Corpus():
+    """
+    Class for reading puzzles from a corpus file through mmap, so fetching puzzle N only reads that puzzle's record.
+    """
+
+    def __init__(self, path):
+        """
+        Raises ValueError if the file at path is empty, not a corpus file or too short for the puzzles its header lists.
+        """
+        self.file = open(path, "rb")
+        try:
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # mmap refuses empty files
+            self.file.close()
+            raise ValueError(f"{path} is empty, not a sudoku corpus file")
+        if len(self.map) < HEADER_SIZE or self.map[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a sudoku corpus file")
+
+        # Dictionary relating each difficulty to the (offset, count) of its records
+        self.levels = dict()
+        for i, difficulty in enumerate(DIFFICULTIES):
+            offset, count = LEVEL_HEADER.unpack_from(self.map, len(MAGIC) + i * LEVEL_HEADER.size)
+            # A truncated file would otherwise open fine and only fail once a missing record is read
+            size = len(self.map)
+            if offset < HEADER_SIZE or offset + count * RECORD_SIZE > size:
+                self.close()
+                raise ValueError(f"{path} is truncated: difficulty {difficulty} needs {offset + count * RECORD_SIZE} bytes, the file has {size}")
+            self.levels[difficulty] = (offset, count)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """
+        Closes the memory map and the file underneath it.
+        """
+        self.map.close()
+        self.file.close()
+
+    def count(self, difficulty):
+        """
+        Returns the number of puzzles stored for a difficulty.
+        """
+        return self.levels[difficulty][1]
+
+    def get(self, difficulty, index):
+        """
+        Returns puzzle number index of a difficulty as a (puzzle, solution) tuple of lists of lists.
+        """
+        offset, count = self.levels[difficulty]
+        if not 0 <= index < count:
+            raise IndexError(f"Difficulty {difficulty} has {count} puzzles, no puzzle {index}")
+        start = offset + index * RECORD_SIZE
+        return unpack(self.map[start:start + PACKED_SIZE]), unpack(self.map[start + PACKED_SIZE:start + RECORD_SIZE])
+
+    def random(self, difficulty):
+        """
+        Returns a random (puzzle, solution) tuple of a difficulty.
+        """
+        return self.get(difficulty, random.randrange(self.count(difficulty)))
+
+
+def main():
+    """
+    Command line entry point for building a corpus file with the same number of puzzles for every difficulty.
+    """
+    parser = argparse.ArgumentParser(description="Build a memory-mapped sudoku corpus file.")
+    parser.add_argument("--count", type=int, default=1000, help="puzzles per difficulty")
+    parser.add_argument("--workers", type=int, default=None, help="number of processes (default: one per CPU)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="puzzles.corpus")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    # Give each difficulty its own range of seeds so they don't share batches
+    levels = {difficulty: generate_many(difficulty, args.count, args.workers, args.seed + difficulty * 1000003) for difficulty in DIFFICULTIES}
+    counts = write_corpus(args.out, levels)
+    elapsed = time.perf_counter() - start
+    print(f"{sum(counts.values())} puzzles written to {args.out} in {elapsed:.2f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
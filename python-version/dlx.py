@@ -0,0 +1,198 @@
+SIZE = 9
+# 324 constraints: every space filled once, and every digit once in every row, column and mini-grid
+CONSTRAINTS = 4 * SIZE * SIZE
+# 729 choices of a digit for a space
+CHOICES = SIZE * SIZE * SIZE
+# Node 0 is the root, nodes 1 to 324 are column headers and choice c has the 4 nodes starting at FIRST_NODE + 4 * c
+FIRST_NODE = CONSTRAINTS + 1
+NODES = FIRST_NODE + 4 * CHOICES
+
+
+def choice_columns(choice):
+    """
+    Returns the 4 column headers covered by choice, where choice = space * 9 + digit - 1.
+    """
+    space, digit = divmod(choice, SIZE)
+    row, column = divmod(space, SIZE)
+    box = (row // 3) * 3 + column // 3
+    return (
+        1 + space,
+        1 + SIZE * SIZE + row * SIZE + digit,
+        1 + 2 * SIZE * SIZE + column * SIZE + digit,
+        1 + 3 * SIZE * SIZE + box * SIZE + digit,
+    )
+
+
+def build_template():
+    """
+    Builds the links of the full exact cover matrix once, as flat lists indexed by node, so every puzzle only has to copy them.
+    Returns (left, right, up, down, column, size).
+    """
+    left = list(range(NODES))
+    right = list(range(NODES))
+    up = list(range(NODES))
+    down = list(range(NODES))
+    column = list(range(NODES))
+    size = [0] * (CONSTRAINTS + 1)
+
+    # Link the root and column headers into one horizontal ring
+    for header in range(CONSTRAINTS + 1):
+        left[header] = header - 1 if header else CONSTRAINTS
+        right[header] = header + 1 if header < CONSTRAINTS else 0
+
+    for choice in range(CHOICES):
+        first = FIRST_NODE + 4 * choice
+        for k, header in enumerate(choice_columns(choice)):
+            node = first + k
+            # Ring of 4 nodes for the choice
+            left[node] = first + (k - 1) % 4
+            right[node] = first + (k + 1) % 4
+            # Add node to the bottom of its column
+            column[node] = header
+            up[node] = up[header]
+            down[node] = header
+            down[up[header]] = node
+            up[header] = node
+            size[header] += 1
+
+    return left, right, up, down, column, size
+
+
+# Links of the full matrix, built the first time a puzzle is solved with dancing links so importing this module stays cheap
+TEMPLATE = None
+
+
+class DancingLinks():
+    """
+    Class for solving a puzzle as an exact cover problem with Knuth's Algorithm X on dancing links.
+    The links are preallocated flat lists of node indices, and covering and uncovering only relink nodes in place.
+    Counts nodes, backtracks and depth with the same names as engine.Search so SolverStats can record either.
+    """
+
+    def __init__(self, puzzle):
+        global TEMPLATE
+        if TEMPLATE is None:
+            TEMPLATE = build_template()
+        self.left, self.right, self.up, self.down, self.column, self.size = [list(links) for links in TEMPLATE]
+        self.nodes = 0
+        self.forced = 0
+        self.backtracks = 0
+        self.maxDepth = 0
+        # Valid is False if the starting values already break a sudoku rule or are not digits 0 to 9
+        self.valid = True
+        self.givens = []
+
+        covered = set()
+        for row in range(SIZE):
+            for column in range(SIZE):
+                value = puzzle[row][column]
+                if value:
+                    # Any other value would pick a choice of a different space, or one past the end of the matrix
+                    if not 0 < value <= SIZE:
+                        self.valid = False
+                        return
+                    choice = (row * SIZE + column) * SIZE + value - 1
+                    headers = choice_columns(choice)
+                    if covered.intersection(headers):
+                        self.valid = False
+                        return
+                    covered.update(headers)
+                    for header in headers:
+                        self.cover(header)
+                    self.givens.append(choice)
+
+    def cover(self, header):
+        """
+        Removes a column and every choice that uses it from the matrix.
+        """
+        left, right, up, down, column, size = self.left, self.right, self.up, self.down, self.column, self.size
+        right[left[header]] = right[header]
+        left[right[header]] = left[header]
+        i = down[header]
+        while i != header:
+            j = right[i]
+            while j != i:
+                down[up[j]] = down[j]
+                up[down[j]] = up[j]
+                size[column[j]] -= 1
+                j = right[j]
+            i = down[i]
+
+    def uncover(self, header):
+        """
+        Undoes cover for a column, relinking in exactly the reverse order.
+        """
+        left, right, up, down, column, size = self.left, self.right, self.up, self.down, self.column, self.size
+        i = up[header]
+        while i != header:
+            j = left[i]
+            while j != i:
+                size[column[j]] += 1
+                down[up[j]] = j
+                up[down[j]] = j
+                j = left[j]
+            i = up[i]
+        right[left[header]] = header
+        left[right[header]] = header
+
+    def solutions(self):
+        """
+        Generator that yields every solution grid for the puzzle as a list of lists.
+        """
+        if self.valid:
+            yield from self.search([], 0)
+
+    def search(self, chosen, depth):
+        """
+        Picks the column with the fewest choices left and tries each of them, yielding a grid each time every column is covered.
+        """
+        right, down, column, size = self.right, self.down, self.column, self.size
+        if depth > self.maxDepth:
+            self.maxDepth = depth
+
+        header = right[0]
+        if header == 0:
+            yield self.to_lists(chosen)
+            return
+
+        # Choose the column with the fewest remaining choices
+        best = header
+        while header:
+            if size[header] < size[best]:
+                best = header
+                if size[best] <= 1:
+                    break
+            header = right[header]
+        if not size[best]:
+            self.backtracks += 1
+            return
+
+        self.cover(best)
+        node = down[best]
+        while node != best:
+            self.nodes += 1
+            chosen.append((node - FIRST_NODE) // 4)
+            j = right[node]
+            while j != node:
+                self.cover(column[j])
+                j = right[j]
+
+            yield from self.search(chosen, depth + 1)
+
+            j = self.left[node]
+            while j != node:
+                self.uncover(column[j])
+                j = self.left[j]
+            chosen.pop()
+            node = down[node]
+        self.uncover(best)
+
+    def to_lists(self, chosen):
+        """
+        Returns the grid made by the givens and the chosen choices as a list of lists.
+        """
+        cells = [0] * (SIZE * SIZE)
+        for choice in self.givens + chosen:
+            space, digit = divmod(choice, SIZE)
+            cells[space] = digit + 1
+        return [cells[i:i + SIZE] for i in range(0, SIZE * SIZE, SIZE)]
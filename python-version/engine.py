@@ -0,0 +1,314 @@
+import math
+
+
+class Shape():
+    """
+    Class for the lookup tables of one size of sudoku: a grid of box * box mini-grids, each box spaces wide and tall,
+    holding the digits 1 to box * box. The standard sudoku has box 3; box 4 is 16x16 and box 5 is 25x25.
+    Candidate bitmasks have bit n set for digit n, so they stay plain ints at every size.
+    """
+
+    def __init__(self, box):
+        self.box = box
+        self.size = box * box
+        self.cells = self.size * self.size
+        # Bits 1 through size set, one bit for each digit that can go in a space
+        self.allDigits = (1 << (self.size + 1)) - 2
+
+        # Row, column and mini-grid index for every space, where space i is row i // size and column i % size
+        self.rowOf = [i // self.size for i in range(self.cells)]
+        self.columnOf = [i % self.size for i in range(self.cells)]
+        self.boxOf = [(i // (self.size * box)) * box + (i % self.size) // box for i in range(self.cells)]
+        # (row, column, mini-grid) of every space, to look all three up at once
+        self.linesOf = list(zip(self.rowOf, self.columnOf, self.boxOf))
+
+        # Dictionary relating a single-bit mask to the digit it stands for
+        self.digitOf = {1 << digit: digit for digit in range(1, self.size + 1)}
+
+        # Spaces in every row, column and mini-grid
+        self.units = [[space for space in range(self.cells) if self.rowOf[space] == i] for i in range(self.size)] + \
+            [[space for space in range(self.cells) if self.columnOf[space] == i] for i in range(self.size)] + \
+            [[space for space in range(self.cells) if self.boxOf[space] == i] for i in range(self.size)]
+
+
+# Dictionary relating a box size to its Shape, so the tables for a size are only built once
+SHAPES = dict()
+
+
+def shape(box):
+    """
+    Returns the Shape for sudokus with mini-grids box spaces wide.
+    """
+    if box not in SHAPES:
+        SHAPES[box] = Shape(box)
+    return SHAPES[box]
+
+
+def shape_of(puzzle):
+    """
+    Returns the Shape of a puzzle grid from its number of rows, raising ValueError if that is not a square number.
+    """
+    box = math.isqrt(len(puzzle))
+    if box < 1 or box * box != len(puzzle):
+        raise ValueError(f"A puzzle must have a square number of rows, got {len(puzzle)}")
+    return shape(box)
+
+
+# Tables for the standard 9x9 sudoku, used by everything that only handles that size
+STANDARD = shape(3)
+SIZE = STANDARD.size
+CELLS = STANDARD.cells
+ALL_DIGITS = STANDARD.allDigits
+ROW_OF = STANDARD.rowOf
+COLUMN_OF = STANDARD.columnOf
+BOX_OF = STANDARD.boxOf
+DIGIT_OF = STANDARD.digitOf
+UNITS = STANDARD.units
+# Number of digits in every possible 9x9 candidate bitmask
+BIT_COUNT = [bin(mask).count("1") for mask in range(ALL_DIGITS + 1)]
+
+
+class SearchLimit(Exception):
+    """
+    Raised by a Search that was given maxNodes when it makes more guesses than that.
+    """
+
+
+class Grid():
+    """
+    Class for holding a sudoku grid as a flat list of values along with bitmasks of the digits already used in every row, column and mini-grid.
+    Digits are placed and removed in place so that a search can undo its moves instead of copying the grid.
+    The size of the grid is taken from the puzzle, so the same class handles 9x9, 16x16 and 25x25 grids.
+    """
+
+    def __init__(self, puzzle):
+        """
+        Puzzle should be a list of lists where each nested list is a row and empty spaces are 0.
+        """
+        self.shape = shape_of(puzzle)
+        # The tables are kept on the grid so the methods below look them up as quickly as module constants
+        self.size = self.shape.size
+        self.allDigits = self.shape.allDigits
+        self.linesOf = self.shape.linesOf
+        self.digitOf = self.shape.digitOf
+
+        self.cells = [value for row in puzzle for value in row]
+        self.rows = [0] * self.size
+        self.columns = [0] * self.size
+        self.boxes = [0] * self.size
+        # Valid is False if the starting values already break a sudoku rule
+        self.valid = True
+        if len(self.cells) != self.shape.cells:
+            self.valid = False
+            return
+
+        for space, value in enumerate(self.cells):
+            if value:
+                if not 0 < value <= self.size:
+                    self.valid = False
+                    continue
+                if not self.candidates(space) & (1 << value):
+                    self.valid = False
+                self.place(space, 1 << value)
+
+    def candidates(self, space):
+        """
+        Returns a bitmask of the digits that can be placed in a space without breaking a sudoku rule.
+        """
+        row, column, box = self.linesOf[space]
+        return self.allDigits & ~(self.rows[row] | self.columns[column] | self.boxes[box])
+
+    def place(self, space, bit):
+        """
+        Puts the digit for bit into a space and marks it as used in that space's row, column and mini-grid.
+        """
+        row, column, box = self.linesOf[space]
+        self.cells[space] = self.digitOf[bit]
+        self.rows[row] |= bit
+        self.columns[column] |= bit
+        self.boxes[box] |= bit
+
+    def clear(self, space, bit):
+        """
+        Undoes place for a space that holds the digit for bit.
+        """
+        row, column, box = self.linesOf[space]
+        self.cells[space] = 0
+        self.rows[row] ^= bit
+        self.columns[column] ^= bit
+        self.boxes[box] ^= bit
+
+    def empty_spaces(self):
+        """
+        Returns the indices of all empty spaces in row-major order.
+        """
+        return [space for space in range(self.shape.cells) if not self.cells[space]]
+
+    def to_lists(self):
+        """
+        Returns the grid as a list of lists where each nested list is a row.
+        """
+        return [self.cells[i:i + self.size] for i in range(0, self.shape.cells, self.size)]
+
+
+class Search():
+    """
+    Class for finding the solutions of one puzzle with a Grid, counting the search nodes it expands along the way.
+    With propagate False, empty spaces are filled in row-major order like the original solver.
+    With propagate True, naked and hidden singles are filled until nothing changes, then the search branches on the space with the fewest candidates.
+    If maxNodes is given with propagate True, SearchLimit is raised once that many guesses have been made, to stop searches that would run too long.
+    """
+
+    def __init__(self, puzzle, propagate=False, maxNodes=None):
+        self.grid = Grid(puzzle)
+        self.propagate = propagate
+        self.maxNodes = maxNodes
+        # Nodes is the number of guesses made, forced is the number of singles filled in by propagation,
+        # backtracks is the number of dead ends reached and maxDepth is the deepest level of guesses
+        self.nodes = 0
+        self.forced = 0
+        self.backtracks = 0
+        self.maxDepth = 0
+
+    def solutions(self):
+        """
+        Generator that yields every solution grid for the puzzle as a list of lists.
+        """
+        if not self.grid.valid:
+            return
+        if self.propagate:
+            yield from self.propagating_search(0)
+        else:
+            yield from self.ordered_search(self.grid.empty_spaces(), 0)
+
+    def ordered_search(self, empty, depth):
+        """
+        Fills empty[depth:] in order by depth-first search, yielding the grid each time every space is filled.
+        """
+        grid = self.grid
+        if depth > self.maxDepth:
+            self.maxDepth = depth
+        if depth == len(empty):
+            yield grid.to_lists()
+            return
+
+        space = empty[depth]
+        options = grid.candidates(space)
+        if not options:
+            self.backtracks += 1
+        while options:
+            # Take the lowest remaining digit and try it
+            bit = options & -options
+            options ^= bit
+            self.nodes += 1
+            grid.place(space, bit)
+            yield from self.ordered_search(empty, depth + 1)
+            grid.clear(space, bit)
+
+    def propagating_search(self, depth):
+        """
+        Fills singles, then branches on the most constrained space, yielding the grid each time every space is filled.
+        Every digit placed at this level is removed again before returning.
+        """
+        grid = self.grid
+        if depth > self.maxDepth:
+            self.maxDepth = depth
+        trail = []
+        if not self.fill_singles(trail):
+            self.backtracks += 1
+        else:
+            space, options = self.most_constrained()
+            if space is None:
+                yield grid.to_lists()
+            while options:
+                bit = options & -options
+                options ^= bit
+                self.nodes += 1
+                if self.nodes == self.maxNodes:
+                    raise SearchLimit()
+                grid.place(space, bit)
+                yield from self.propagating_search(depth + 1)
+                grid.clear(space, bit)
+
+        for space in reversed(trail):
+            grid.clear(space, 1 << grid.cells[space])
+
+    def fill_singles(self, trail):
+        """
+        Places naked singles (spaces with one candidate) and hidden singles (digits with one possible space in a row, column or mini-grid) until none are left.
+        Appends every filled space to trail and returns False if the grid reaches a contradiction.
+        """
+        grid = self.grid
+        cells = grid.cells
+        allDigits = grid.allDigits
+        changed = True
+        while changed:
+            changed = False
+
+            for space in range(len(cells)):
+                if not cells[space]:
+                    options = grid.candidates(space)
+                    if not options:
+                        return False
+                    if not options & (options - 1):
+                        grid.place(space, options)
+                        trail.append(space)
+                        self.forced += 1
+                        changed = True
+
+            for unit in grid.shape.units:
+                # Digits that fit in at least one space and in more than one space of the unit
+                once = 0
+                more = 0
+                placed = 0
+                for space in unit:
+                    if cells[space]:
+                        placed |= 1 << cells[space]
+                    else:
+                        options = grid.candidates(space)
+                        more |= once & options
+                        once |= options
+                # A digit with no space left in the unit means there is no solution
+                if (once | placed) != allDigits:
+                    return False
+
+                single = once & ~more
+                if single:
+                    for space in unit:
+                        if not cells[space]:
+                            bit = grid.candidates(space) & single
+                            if bit:
+                                # Two digits that can only go in the same space means there is no solution
+                                if bit & (bit - 1):
+                                    return False
+                                grid.place(space, bit)
+                                trail.append(space)
+                                self.forced += 1
+                                changed = True
+        return True
+
+    def most_constrained(self):
+        """
+        Returns the empty space with the fewest candidates and its candidate bitmask, or (None, 0) if the grid is full.
+        """
+        grid = self.grid
+        best = None
+        bestOptions = 0
+        bestCount = grid.size + 1
+        for space in range(len(grid.cells)):
+            if not grid.cells[space]:
+                options = grid.candidates(space)
+                count = options.bit_count()
+                if count < bestCount:
+                    best, bestOptions, bestCount = space, options, count
+                    # Singles are already filled, so two candidates is the best possible
+                    if count <= 2:
+                        break
+        return best, bestOptions
+
+
+def solutions(puzzle, propagate=False):
+    """
+    Generator that yields every solution grid for a puzzle, backtracking by undoing moves.
+    """
+    yield from Search(puzzle, propagate).solutions()
@@ -1,6 +1,16 @@
+import argparse
+import itertools
+import operator
 import random
-import copy
-from sudoku import solve
+import sys
+import time
+
+from canonical import Transform
+from codec import from_line, to_line, write_lines, write_packed
+from grade import GRADES, grade
+from engine import Search, SearchLimit
+from helper import SolverStats
+from sudoku import solve, has_unique_solution
 
 EMPTY = [
     [0, 0, 0, 0, 0, 0, 0, 0, 0],
@@ -21,21 +31,42 @@ DIFFICULTIES = {
     3: 56
 }
 
+# Numbers generate_sized removes for every box size unless told otherwise, about half of the grid
+SIZED_HOLES = {
+    3: 50,
+    4: 140,
+    5: 300
+}
+# Most guesses generate_sized spends proving that a removal keeps one solution before it puts the number back
+NODE_LIMIT = 1000
+
 
-def generate_puzzle(difficulty):
+def generate_puzzle(difficulty, stats=None):
+    """
+    Returns a (puzzle, solution) tuple, where puzzle has DIFFICULTIES[difficulty] numbers removed and only one solution.
+    If stats is a SolverStats, every solver call made is added to it.
+    """
     nonZeroSquares = []
     # Create a first row for the empty puzzle of randomly arranged numbers
     # (necessary for easily creating puzzle with solve function)
     start = [1, 2, 3, 4, 5, 6, 7, 8, 9]
     random.shuffle(start)
-    EMPTY[0] = start
+    # Copy the empty grid so that EMPTY is never changed and puzzles can be generated in parallel
+    grid = [row[:] for row in EMPTY]
+    grid[0] = start
     removed = 0
     # Fill in rest of puzzle with solve function
-    solution = solve(EMPTY, False)
-    puzzle = copy.deepcopy(solution)
+    solution = solve(grid, False, stats=stats)
+    puzzle = [row[:] for row in solution]
 
     # Remove numbers until the puzzle is a certain difficulty
     while removed < DIFFICULTIES[difficulty]:
+        # If every remaining number has already been tried, this solution can't reach the difficulty, so start again
+        if removed + len(nonZeroSquares) == 81:
+            if stats is not None:
+                stats.restarts += 1
+            return generate_puzzle(difficulty, stats)
+
         # Select a square to remove a number from
         column = random.randint(0, 8)
         row = random.randint(0, 8)
@@ -49,17 +80,246 @@ def generate_puzzle(difficulty):
         puzzle[row][column] = 0
 
         # If there is more than one solution for the puzzle, add the number back and don't remove that number again
-        if solve(puzzle, True) > 1:
+        if not has_unique_solution(puzzle, stats):
             puzzle[row][column] = changedBox
             nonZeroSquares.append((row, column))
         else:
             removed += 1
-    
+
+    if stats is not None:
+        stats.puzzles += 1
+    return puzzle, solution
+
+
+def generate_graded(level, stats=None):
+    """
+    Returns a (puzzle, solution) tuple with only one solution whose grade.grade score is within the band GRADES[level].
+    Numbers are removed in a random order and put back whenever the puzzle would score above the band or have more than one solution,
+    so every removal is tried once. If the finished puzzle still scores below the band, it starts again with a new solution.
+    If stats is a SolverStats, every solver call made is added to it.
+    """
+    low, high = GRADES[level]
+    start = [1, 2, 3, 4, 5, 6, 7, 8, 9]
+    random.shuffle(start)
+    grid = [row[:] for row in EMPTY]
+    grid[0] = start
+    solution = solve(grid, False, stats=stats)
+    puzzle = [row[:] for row in solution]
+
+    spaces = [(row, column) for row in range(9) for column in range(9)]
+    random.shuffle(spaces)
+    score = 0.0
+    for row, column in spaces:
+        changedBox = puzzle[row][column]
+        puzzle[row][column] = 0
+        # Grading stops as soon as a technique above the band is needed, and a puzzle the techniques finish is already known to be unique
+        result = grade(puzzle, high)
+        if result.score > high or (not result.solved and not has_unique_solution(puzzle, stats)):
+            puzzle[row][column] = changedBox
+        else:
+            score = result.score
+
+    if score < low:
+        if stats is not None:
+            stats.restarts += 1
+        return generate_graded(level, stats)
+    if stats is not None:
+        stats.puzzles += 1
     return puzzle, solution
 
+
+def proven_unique(puzzle, maxNodes, stats=None):
+    """
+    Returns True if a search of at most maxNodes guesses shows that a puzzle has exactly one solution.
+    A puzzle that needs a longer search is treated as not unique, so a generator only removes numbers it can prove are safe to remove,
+    instead of stalling on the rare removal that makes a large grid very hard to count.
+    """
+    search = Search(puzzle, True, maxNodes)
+    start = time.perf_counter()
+    found = 0
+    try:
+        for _ in search.solutions():
+            found += 1
+            if found == 2:
+                break
+    except SearchLimit:
+        found = 0
+    if stats is not None:
+        stats.record_search(search, time.perf_counter() - start, found)
+    return found == 1
+
+
+def generate_sized(box, holes=None, stats=None):
+    """
+    Returns a (puzzle, solution) tuple for a sudoku of any size, box * box spaces wide, with holes numbers removed and only one solution.
+    Box 3 is the standard 9x9 sudoku, box 4 is 16x16 and box 5 is 25x25. Holes defaults to SIZED_HOLES[box].
+    Every space is tried once in a random order, and its number is only removed if proven_unique shows the puzzle keeps one solution.
+    If every space has been tried before holes numbers are removed, it starts again with a new solution.
+    If stats is a SolverStats, every solver call made is added to it.
+    """
+    if holes is None:
+        holes = SIZED_HOLES[box]
+    size = box * box
+    grid = [[0] * size for _ in range(size)]
+    grid[0] = random.sample(range(1, size + 1), size)
+    solution = solve(grid, False, True, stats)
+    puzzle = [row[:] for row in solution]
+
+    spaces = [(row, column) for row in range(size) for column in range(size)]
+    random.shuffle(spaces)
+    removed = 0
+    for row, column in spaces:
+        if removed == holes:
+            break
+        changedBox = puzzle[row][column]
+        puzzle[row][column] = 0
+        if proven_unique(puzzle, NODE_LIMIT, stats):
+            removed += 1
+        else:
+            puzzle[row][column] = changedBox
+
+    if removed < holes:
+        if stats is not None:
+            stats.restarts += 1
+        return generate_sized(box, holes, stats)
+    if stats is not None:
+        stats.puzzles += 1
+    return puzzle, solution
+
+
+def generate_batch(job):
+    """
+    Generates a batch of puzzles in a worker process and returns a list of (puzzle, solution) tuples along with a SolverStats dictionary or None.
+
+    job -- Tuple of (difficulty, count, seed, collectStats, graded), where seed makes the batch the same every time it is generated
+    and graded means difficulty is a level of grade.GRADES for generate_graded instead of a key of DIFFICULTIES\n
+    """
+    difficulty, count, seed, collectStats, graded = job
+    random.seed(seed)
+    stats = SolverStats() if collectStats else None
+    generate = generate_graded if graded else generate_puzzle
+    batch = [generate(difficulty, stats) for _ in range(count)]
+    return batch, (stats.to_dict() if collectStats else None)
+
+
+def generate_many(difficulty, count, workers=None, seed=0, batchSize=50, stats=None, graded=False):
+    """
+    Generator that yields count (puzzle, solution) tuples of a difficulty, generated by a pool of worker processes.
+    Batch i is always generated with seed + i, so the output is the same for the same seed no matter how many workers are used.
+    If stats is a SolverStats, the counters from every worker are merged into it.
+    If graded is True, difficulty is a level of grade.GRADES and puzzles are made with generate_graded.
+    """
+    # Only callers that generate in parallel pay for importing multiprocessing
+    import multiprocessing
+
+    jobs = []
+    for i, start in enumerate(range(0, count, batchSize)):
+        jobs.append((difficulty, min(batchSize, count - start), seed + i, stats is not None, graded))
+
+    with multiprocessing.Pool(workers) as pool:
+        # imap hands back batches in order as soon as they are finished
+        for batch, batchStats in pool.imap(generate_batch, jobs):
+            if stats is not None:
+                stats.merge(batchStats)
+            yield from batch
+
+
+def random_transform(rng=random):
+    """
+    Returns a random canonical.Transform that keeps a sudoku valid: a digit relabeling, row and column swaps inside bands and stacks,
+    band and stack swaps and possibly a transposition, which together with the swaps covers every rotation and reflection.
+    """
+    rows = [band * 3 + row for band in rng.sample(range(3), 3) for row in rng.sample(range(3), 3)]
+    columns = [stack * 3 + column for stack in rng.sample(range(3), 3) for column in rng.sample(range(3), 3)]
+    digits = rng.sample(range(1, 10), 9)
+    return Transform(rng.random() < 0.5, rows, columns, {digit: digits[digit - 1] for digit in range(1, 10)})
+
+
+# Every row (or column) order that keeps bands (or stacks) together, for picking random symmetries quickly
+LINE_ORDERS = [
+    [band * 3 + line for band, inside in zip(bands, insides) for line in inside]
+    for bands in itertools.permutations(range(3))
+    for insides in itertools.product(itertools.permutations(range(3)), repeat=3)
+]
+
+
+def derive_lines(seeds, count, rng=random):
+    """
+    Generator that yields count (puzzle, solution) pairs of 81-digit lines, each a random symmetry of a random seed.
+    Every seed should be a (puzzle, solution) tuple of a puzzle with one solution; the symmetries keep it that way, so no solving is needed.
+    Works on strings with the same symmetries as random_transform, which is much faster than applying a Transform to lists.
+    """
+    seedLines = [(to_line(puzzle), to_line(solution)) for puzzle, solution in seeds]
+    for _ in range(count):
+        puzzle, solution = rng.choice(seedLines)
+        rows = rng.choice(LINE_ORDERS)
+        columns = rng.choice(LINE_ORDERS)
+        # Reading the grid column by column transposes it
+        if rng.random() < 0.5:
+            order = [row * 9 + column for row in rows for column in columns]
+        else:
+            order = [column * 9 + row for row in rows for column in columns]
+        table = str.maketrans("123456789", "".join(rng.sample("123456789", 9)))
+        pick = operator.itemgetter(*order)
+        yield "".join(pick(puzzle)).translate(table), "".join(pick(solution)).translate(table)
+
+
+def derive_puzzles(seeds, count, rng=random):
+    """
+    Generator that yields count (puzzle, solution) tuples of lists of lists derived from seeds like derive_lines.
+    """
+    for puzzle, solution in derive_lines(seeds, count, rng):
+        yield from_line(puzzle), from_line(solution)
+
+
 def main():
-    generate_puzzle(0)
+    """
+    Command line entry point for generating many puzzles at once and writing them as 81-digit lines or packed records.
+    """
+    parser = argparse.ArgumentParser(description="Generate sudoku puzzles in parallel.")
+    parser.add_argument("--difficulty", type=int, choices=sorted(DIFFICULTIES), default=0)
+    parser.add_argument("--grade", type=int, choices=sorted(GRADES), default=None,
+                        help="target a band of technique scores instead of a number of removed numbers")
+    parser.add_argument("--count", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=None, help="number of processes (default: one per CPU)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="-", help="file to write puzzles to (default: stdout)")
+    parser.add_argument("--format", choices=["line", "packed"], default="line", help="81-digit lines or 41-byte packed records")
+    parser.add_argument("--stats", default=None, help="file to write solver counters to as JSON")
+    parser.add_argument("--seeds", type=int, default=None,
+                        help="generate this many seed puzzles, then derive --count puzzles from them by symmetry without solving")
+    args = parser.parse_args()
+    stats = SolverStats() if args.stats else None
+
+    if args.format == "packed":
+        writer = write_packed
+        out = sys.stdout.buffer if args.out == "-" else open(args.out, "wb")
+    else:
+        writer = write_lines
+        out = sys.stdout if args.out == "-" else open(args.out, "w")
+    difficulty = args.difficulty if args.grade is None else args.grade
+    graded = args.grade is not None
+    start = time.perf_counter()
+    try:
+        if args.seeds:
+            seeds = list(generate_many(difficulty, args.seeds, args.workers, args.seed, stats=stats, graded=graded))
+            # Derived puzzles are already lines, so write them without turning them into lists and back
+            for puzzle, _ in derive_lines(seeds, args.count, random.Random(args.seed)):
+                out.write(bytes.fromhex(puzzle + "0") if args.format == "packed" else puzzle + "\n")
+        else:
+            puzzles = (puzzle for puzzle, _ in generate_many(difficulty, args.count, args.workers, args.seed, stats=stats, graded=graded))
+            writer(out, puzzles)
+    finally:
+        if out not in (sys.stdout, sys.stdout.buffer):
+            out.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"{args.count} puzzles in {elapsed:.2f}s ({args.count / elapsed:.1f} puzzles/s)", file=sys.stderr)
+
+    if stats is not None:
+        with open(args.stats, "w") as f:
+            f.write(stats.to_json())
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,268 @@
+import itertools
+from collections import namedtuple
+
+from engine import ALL_DIGITS, BIT_COUNT, BOX_OF, CELLS, COLUMN_OF, DIGIT_OF, ROW_OF, SIZE, UNITS
+from hints import HIDDEN_SINGLE, NAKED_SINGLE
+
+LOCKED_CANDIDATES = "locked candidates"
+NAKED_PAIR = "naked pair"
+X_WING = "x-wing"
+HIDDEN_PAIR = "hidden pair"
+NAKED_TRIPLE = "naked triple"
+SWORDFISH = "swordfish"
+HIDDEN_TRIPLE = "hidden triple"
+# Puzzles the techniques cannot finish need guessing, which is rated above every technique
+TRIAL_AND_ERROR = "trial and error"
+
+# Dictionary relating every technique to its rating, roughly following the ratings of Sudoku Explainer
+RATINGS = {
+    HIDDEN_SINGLE: 1.2,
+    NAKED_SINGLE: 2.3,
+    LOCKED_CANDIDATES: 2.6,
+    NAKED_PAIR: 3.0,
+    X_WING: 3.2,
+    HIDDEN_PAIR: 3.4,
+    NAKED_TRIPLE: 3.6,
+    SWORDFISH: 3.8,
+    HIDDEN_TRIPLE: 4.0,
+    TRIAL_AND_ERROR: 5.0,
+}
+
+# Dictionary relating a grade to the (low, high) band of scores it covers, used by generate.generate_graded
+GRADES = {
+    0: (1.2, 1.2),
+    1: (2.3, 2.3),
+    2: (2.6, 4.0),
+    3: (5.0, 5.0)
+}
+
+# Unit numbers of the row, column and mini-grid of every space, numbered like engine.UNITS
+UNITS_OF = [(ROW_OF[space], SIZE + COLUMN_OF[space], 2 * SIZE + BOX_OF[space]) for space in range(CELLS)]
+# Every space that shares a row, column or mini-grid with a space
+PEERS = [sorted(set(itertools.chain(*(UNITS[unit] for unit in UNITS_OF[space]))) - {space}) for space in range(CELLS)]
+UNIT_SETS = [set(unit) for unit in UNITS]
+
+Grade = namedtuple("Grade", ["score", "technique", "solved", "steps"])
+
+
+def place(cells, options, space, bit):
+    """
+    Puts the digit for bit into a space and removes it from the candidates of every peer.
+    """
+    cells[space] = DIGIT_OF[bit]
+    options[space] = 0
+    for peer in PEERS[space]:
+        options[peer] &= ~bit
+
+
+def eliminate(options, spaces, mask):
+    """
+    Removes the digits in mask from the candidates of spaces and returns True if any were there.
+    """
+    changed = False
+    for space in spaces:
+        if options[space] & mask:
+            options[space] &= ~mask
+            changed = True
+    return changed
+
+
+def hidden_singles(cells, options):
+    """
+    Places every digit that has only one possible space in a unit and returns how many were placed.
+    """
+    placed = 0
+    for unit in UNITS:
+        once = 0
+        more = 0
+        for space in unit:
+            more |= once & options[space]
+            once |= options[space]
+        single = once & ~more
+        while single:
+            bit = single & -single
+            single ^= bit
+            for space in unit:
+                if options[space] & bit:
+                    place(cells, options, space, bit)
+                    placed += 1
+                    break
+    return placed
+
+
+def naked_singles(cells, options):
+    """
+    Places the digit in every space that has only one candidate and returns how many were placed.
+    """
+    placed = 0
+    for space in range(CELLS):
+        if BIT_COUNT[options[space]] == 1:
+            place(cells, options, space, options[space])
+            placed += 1
+    return placed
+
+
+def locked_candidates(cells, options):
+    """
+    Pointing and claiming: when a digit's spaces in one unit all lie in another unit too, removes it from the rest of the other unit.
+    Returns 1 if any candidate was removed.
+    """
+    for unit, spaces in enumerate(UNITS):
+        digits = 0
+        for space in spaces:
+            digits |= options[space]
+        while digits:
+            bit = digits & -digits
+            digits ^= bit
+            where = [space for space in spaces if options[space] & bit]
+            if len(where) < 2:
+                continue
+            for other in UNITS_OF[where[0]]:
+                if other != unit and all(space in UNIT_SETS[other] for space in where):
+                    if eliminate(options, [space for space in UNITS[other] if space not in where], bit):
+                        return 1
+    return 0
+
+
+def naked_subsets(options, size):
+    """
+    Removes the digits of size spaces in a unit that only have size candidates between them from the rest of the unit.
+    Returns 1 if any candidate was removed.
+    """
+    for spaces in UNITS:
+        small = [space for space in spaces if 2 <= BIT_COUNT[options[space]] <= size]
+        if len(small) < size:
+            continue
+        for subset in itertools.combinations(small, size):
+            mask = 0
+            for space in subset:
+                mask |= options[space]
+            if BIT_COUNT[mask] == size and eliminate(options, [space for space in spaces if space not in subset], mask):
+                return 1
+    return 0
+
+
+def hidden_subsets(options, size):
+    """
+    Removes every other candidate from size spaces in a unit that are the only places for size digits.
+    Returns 1 if any candidate was removed.
+    """
+    for spaces in UNITS:
+        # Positions[digit] is a bitmask of the places in the unit the digit can go
+        positions = {}
+        for digit in range(1, SIZE + 1):
+            bit = 1 << digit
+            mask = 0
+            for i, space in enumerate(spaces):
+                if options[space] & bit:
+                    mask |= 1 << i
+            if 2 <= BIT_COUNT[mask] <= size:
+                positions[digit] = mask
+        if len(positions) < size:
+            continue
+        for digits in itertools.combinations(positions, size):
+            mask = 0
+            for digit in digits:
+                mask |= positions[digit]
+            if BIT_COUNT[mask] == size:
+                keep = sum(1 << digit for digit in digits)
+                where = [spaces[i] for i in range(SIZE) if mask >> i & 1]
+                if eliminate(options, where, ALL_DIGITS & ~keep):
+                    return 1
+    return 0
+
+
+def fish(options, size):
+    """
+    X-wing (size 2) and swordfish (size 3): when a digit's places in size rows lie in only size columns, removes it from the rest of those columns,
+    and the same with rows and columns swapped. Returns 1 if any candidate was removed.
+    """
+    rows = UNITS[:SIZE]
+    columns = UNITS[SIZE:2 * SIZE]
+    for bases, covers in ((rows, columns), (columns, rows)):
+        for digit in range(1, SIZE + 1):
+            bit = 1 << digit
+            # Lines relating a base line to a bitmask of the cover lines the digit can go in
+            lines = {}
+            for b, spaces in enumerate(bases):
+                mask = 0
+                for i, space in enumerate(spaces):
+                    if options[space] & bit:
+                        mask |= 1 << i
+                if 2 <= BIT_COUNT[mask] <= size:
+                    lines[b] = mask
+            if len(lines) < size:
+                continue
+            for subset in itertools.combinations(lines, size):
+                mask = 0
+                for b in subset:
+                    mask |= lines[b]
+                if BIT_COUNT[mask] == size:
+                    # covers[c][b] is the space where cover line c crosses base line b
+                    where = [covers[c][b] for c in range(SIZE) if mask >> c & 1 for b in range(SIZE) if b not in subset]
+                    if eliminate(options, where, bit):
+                        return 1
+    return 0
+
+
+# Techniques from easiest to hardest, each a function of (cells, options) that returns how many steps it took, 0 if it found nothing
+TECHNIQUES = [
+    (HIDDEN_SINGLE, hidden_singles),
+    (NAKED_SINGLE, naked_singles),
+    (LOCKED_CANDIDATES, locked_candidates),
+    (NAKED_PAIR, lambda cells, options: naked_subsets(options, 2)),
+    (X_WING, lambda cells, options: fish(options, 2)),
+    (HIDDEN_PAIR, lambda cells, options: hidden_subsets(options, 2)),
+    (NAKED_TRIPLE, lambda cells, options: naked_subsets(options, 3)),
+    (SWORDFISH, lambda cells, options: fish(options, 3)),
+    (HIDDEN_TRIPLE, lambda cells, options: hidden_subsets(options, 3)),
+]
+
+
+def grade(puzzle, limit=None):
+    """
+    Solves a puzzle like a person would, always using the easiest technique that makes progress, and returns a Grade of
+    (score, technique, solved, steps), where score is the rating of the hardest technique needed, technique is its name,
+    solved is True if the techniques finished the puzzle and steps is a dictionary relating every technique used to how many times.
+    Puzzles the techniques cannot finish get the rating of TRIAL_AND_ERROR.
+    If limit is given, grading stops as soon as a technique rated above limit is needed, and that technique is returned unsolved.
+    A puzzle the techniques finish always has exactly one solution, since they only remove candidates that cannot be right.
+    """
+    cells = [value for row in puzzle for value in row]
+    rows = [0] * SIZE
+    columns = [0] * SIZE
+    boxes = [0] * SIZE
+    for space, value in enumerate(cells):
+        if value:
+            bit = 1 << value
+            rows[ROW_OF[space]] |= bit
+            columns[COLUMN_OF[space]] |= bit
+            boxes[BOX_OF[space]] |= bit
+    options = [0 if cells[space] else ALL_DIGITS & ~(rows[ROW_OF[space]] | columns[COLUMN_OF[space]] | boxes[BOX_OF[space]])
+               for space in range(CELLS)]
+
+    steps = {}
+    hardest = None
+    empty = cells.count(0)
+    while empty:
+        # An empty space with no candidates means the puzzle has no solution
+        if any(not cells[space] and not options[space] for space in range(CELLS)):
+            break
+        for technique, apply in TECHNIQUES:
+            if limit is not None and RATINGS[technique] > limit:
+                return Grade(RATINGS[technique], technique, False, steps)
+            taken = apply(cells, options)
+            if taken:
+                steps[technique] = steps.get(technique, 0) + taken
+                if hardest is None or RATINGS[technique] > RATINGS[hardest]:
+                    hardest = technique
+                break
+        else:
+            break
+        empty = cells.count(0)
+
+    if empty:
+        return Grade(RATINGS[TRIAL_AND_ERROR], TRIAL_AND_ERROR, False, steps)
+    if hardest is None:
+        return Grade(0.0, None, True, steps)
+    return Grade(RATINGS[hardest], hardest, True, steps)
@@ -1,3 +1,7 @@
+import json
+import time
+
+
 class StackFrontier():
     """
     Class for implementing a frontier as a list that removes and returns the last element when prompted.
@@ -23,6 +27,78 @@ class StackFrontier():
         Remove and return last element in frontier.
         """
         # Don't need to check if frontier is empty because that is done in solve function of sudoku.py
-        node = self.frontier[-1]
-        self.frontier = self.frontier[:-1]
-        return node
\ No newline at end of file
+        # pop takes the last element off in place instead of copying the rest of the frontier
+        return self.frontier.pop()
+
+
+class SolverStats():
+    """
+    Class for collecting counters from solver and generator calls.
+    Pass one as the stats argument of the solve functions or generate_puzzle; when stats is None nothing is recorded.
+    """
+
+    def __init__(self):
+        self.solverCalls = 0
+        # Guesses made, spaces filled by propagation and dead ends reached
+        self.nodes = 0
+        self.forced = 0
+        self.backtracks = 0
+        self.solutions = 0
+        # Largest number of states waiting on the frontier, or deepest search level for the engine
+        self.maxFrontier = 0
+        # Seconds spent in solver calls, and inside available() and deepcopy for solve_backtrack
+        self.solveTime = 0.0
+        self.availableTime = 0.0
+        self.copyTime = 0.0
+        # Puzzles finished by generate_puzzle and times it had to start over with a new solution
+        self.puzzles = 0
+        self.restarts = 0
+
+    def record_search(self, search, elapsed, solutions):
+        """
+        Adds the counters of a finished engine Search to the totals.
+        """
+        self.solverCalls += 1
+        self.nodes += search.nodes
+        self.forced += search.forced
+        self.backtracks += search.backtracks
+        self.solutions += solutions
+        self.maxFrontier = max(self.maxFrontier, search.maxDepth)
+        self.solveTime += elapsed
+
+    def timer(self, field, function):
+        """
+        Returns a version of function that adds the seconds spent in it to the field of this name.
+        """
+        def timed(*args):
+            start = time.perf_counter()
+            result = function(*args)
+            setattr(self, field, getattr(self, field) + time.perf_counter() - start)
+            return result
+        return timed
+
+    def merge(self, other):
+        """
+        Adds the counters of another SolverStats, or of a dictionary made by to_dict, to the totals.
+        """
+        if isinstance(other, SolverStats):
+            other = other.to_dict()
+        for field, value in other.items():
+            if field == "maxFrontier":
+                self.maxFrontier = max(self.maxFrontier, value)
+            elif hasattr(self, field):
+                setattr(self, field, getattr(self, field) + value)
+
+    def to_dict(self):
+        """
+        Returns the counters as a dictionary.
+        """
+        return dict(vars(self))
+
+    def to_json(self):
+        """
+        Returns the counters as a JSON string, with the average solver calls per generated puzzle added.
+        """
+        data = self.to_dict()
+        data["solverCallsPerPuzzle"] = self.solverCalls / self.puzzles if self.puzzles else None
+        return json.dumps(data, indent=2)
@@ -0,0 +1,106 @@
+from engine import ALL_DIGITS, BIT_COUNT, BOX_OF, CELLS, COLUMN_OF, DIGIT_OF, ROW_OF, SIZE, UNITS
+
+NAKED_SINGLE = "naked single"
+HIDDEN_SINGLE = "hidden single"
+
+
+class Candidates():
+    """
+    Class for tracking which digits can still go in every space of a board that is being played.
+    Keeps a count of every digit in every row, column and mini-grid, so a number that repeats a digit can be removed again without rescanning.
+    Spaces are numbered x * 9 + y for puzzle[x][y], the same as Board.
+    If the solution is given, numbers that differ from it are left out and their spaces count as empty, so notes and hints never
+    follow from a wrong number; a hint can then point at a space holding a wrong number, with the number that belongs there.
+    """
+
+    def __init__(self, puzzle, solved=None):
+        self.solution = None if solved is None else [value for row in solved for value in row]
+        self.cells = [value if self.is_right(space, value) else 0 for space, value in enumerate(value for row in puzzle for value in row)]
+        # Counts[unit][digit] is how many times digit appears in a unit, where units 0-8 are rows, 9-17 columns and 18-26 mini-grids
+        self.counts = [[0] * (SIZE + 1) for _ in range(3 * SIZE)]
+        # Used[unit] is a bitmask of the digits with a count above 0
+        self.used = [0] * (3 * SIZE)
+        for space, value in enumerate(self.cells):
+            if value:
+                self.add(space, value)
+
+    def is_right(self, space, value):
+        """
+        Returns whether value agrees with the solution in a space, which every value does without a solution.
+        """
+        return self.solution is None or self.solution[space] == value
+
+    def units(self, space):
+        """
+        Returns the row, column and mini-grid unit numbers of a space.
+        """
+        return ROW_OF[space], SIZE + COLUMN_OF[space], 2 * SIZE + BOX_OF[space]
+
+    def add(self, space, value):
+        """
+        Counts value in the 3 units of a space.
+        """
+        for unit in self.units(space):
+            self.counts[unit][value] += 1
+            self.used[unit] |= 1 << value
+
+    def place(self, space, value):
+        """
+        Records that value was put in an empty space. A value that differs from the solution is not recorded.
+        """
+        if self.is_right(space, value):
+            self.cells[space] = value
+            self.add(space, value)
+
+    def clear(self, space):
+        """
+        Records that the value in a space was deleted.
+        """
+        value = self.cells[space]
+        if not value:
+            return
+        self.cells[space] = 0
+        for unit in self.units(space):
+            self.counts[unit][value] -= 1
+            if not self.counts[unit][value]:
+                self.used[unit] &= ~(1 << value)
+
+    def candidates(self, space):
+        """
+        Returns a bitmask of the digits that can go in an empty space, with bit n set for digit n.
+        """
+        row, column, box = self.units(space)
+        return ALL_DIGITS & ~(self.used[row] | self.used[column] | self.used[box])
+
+    def all_notes(self):
+        """
+        Returns a list of candidate bitmasks for every space, with 0 for filled spaces.
+        """
+        return [0 if self.cells[space] else self.candidates(space) for space in range(CELLS)]
+
+    def next_step(self):
+        """
+        Returns the next logical move as a (space, digit, technique) tuple, or None if no single can be found.
+        Naked singles (a space with one candidate) are looked for before hidden singles (a digit with one possible space in a unit).
+        """
+        for space in range(CELLS):
+            if not self.cells[space]:
+                options = self.candidates(space)
+                if BIT_COUNT[options] == 1:
+                    return space, DIGIT_OF[options], NAKED_SINGLE
+
+        for unit in UNITS:
+            once = 0
+            more = 0
+            for space in unit:
+                if not self.cells[space]:
+                    options = self.candidates(space)
+                    more |= once & options
+                    once |= options
+            single = once & ~more
+            if single:
+                bit = single & -single
+                for space in unit:
+                    if not self.cells[space] and self.candidates(space) & bit:
+                        return space, DIGIT_OF[bit], HIDDEN_SINGLE
+        return None
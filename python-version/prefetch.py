@@ -0,0 +1,69 @@
+import queue
+import random
+import threading
+from concurrent.futures import CancelledError, ProcessPoolExecutor
+
+from generate import DIFFICULTIES, generate_puzzle
+
+
+class PuzzlePrefetcher():
+    """
+    Class for keeping a small queue of ready (puzzle, solution) tuples for every difficulty.
+    Puzzles are generated in worker processes so that whoever is taking puzzles, like the GUI event loop, is never blocked by generation.
+    """
+
+    def __init__(self, size=2, workers=1, difficulties=DIFFICULTIES):
+        """
+        size -- Number of puzzles kept ready for each difficulty\n
+        workers -- Number of processes generating puzzles\n
+        difficulties -- Difficulties to keep puzzles ready for\n
+        """
+        self.queues = {difficulty: queue.Queue(size) for difficulty in difficulties}
+        self.stopping = threading.Event()
+        # Seed every worker separately, otherwise forked workers would all generate the same puzzles
+        self.executor = ProcessPoolExecutor(workers, initializer=random.seed)
+        self.threads = []
+        for difficulty in difficulties:
+            thread = threading.Thread(target=self.fill, args=(difficulty,), daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def fill(self, difficulty):
+        """
+        Keeps the queue for a difficulty full until close is called. Runs in its own thread.
+        """
+        while not self.stopping.is_set():
+            try:
+                puzzle = self.executor.submit(generate_puzzle, difficulty).result()
+            except (CancelledError, RuntimeError):
+                # The executor was shut down by close
+                return
+            # Wait for room in the queue, checking now and then whether to stop
+            while not self.stopping.is_set():
+                try:
+                    self.queues[difficulty].put(puzzle, timeout=0.1)
+                    break
+                except queue.Full:
+                    pass
+
+    def get(self, difficulty):
+        """
+        Returns a ready (puzzle, solution) tuple for a difficulty, or None if none are ready yet.
+        """
+        try:
+            return self.queues[difficulty].get_nowait()
+        except queue.Empty:
+            return None
+
+    def ready(self, difficulty):
+        """
+        Returns the number of puzzles ready for a difficulty.
+        """
+        return self.queues[difficulty].qsize()
+
+    def close(self):
+        """
+        Stops the filling threads and the worker processes.
+        """
+        self.stopping.set()
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -1,32 +1,211 @@
-from bs4 import BeautifulSoup as bs
+import argparse
+import hashlib
+import os
+import re
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
+from requests.adapters import HTTPAdapter
+
+from corpus import write_corpus
+from sudoku import solve
+
+# The puzzle_grid table starts at its id and ends at the first closing table tag after it
+GRID_START = re.compile(r"""id\s*=\s*["']?puzzle_grid\b""", re.IGNORECASE)
+GRID_END = re.compile(r"</table", re.IGNORECASE)
+INPUT = re.compile(r"<input\b[^>]*>", re.IGNORECASE)
+VALUE = re.compile(r"""\bvalue\s*=\s*["']?(\d)""", re.IGNORECASE)
+
+# Dictionary relating each websudoku level to the difficulty it is stored as in a corpus file
+LEVELS = {
+    "1": 0,
+    "2": 1,
+    "3": 2,
+    "4": 3
+}
+
+
+def make_session(workers=8):
+    """
+    Returns a requests session that keeps up to workers connections open, so concurrent fetches reuse connections instead of reconnecting.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=workers)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def parse_puzzle(page):
+    """
+    Returns the puzzle in the puzzle_grid table of a websudoku page as a list of lists where each list is a row.
+    Only the table is scanned, and only for its input tags, instead of parsing the whole page.
+    Raises ValueError if the page does not have a table of 81 spaces.
+    """
+    start = GRID_START.search(page)
+    if start is None:
+        raise ValueError("Page has no puzzle_grid table")
+    end = GRID_END.search(page, start.end())
+    inputs = INPUT.findall(page, start.end(), end.start() if end else len(page))
+    if len(inputs) != 81:
+        raise ValueError(f"puzzle_grid table has {len(inputs)} spaces instead of 81")
+
+    values = []
+    for tag in inputs:
+        # If a box is not empty, its number is in the value attribute of its input
+        value = VALUE.search(tag)
+        values.append(int(value.group(1)) if value else 0)
+    return [values[i:i + 9] for i in range(0, 81, 9)]
+
+
+class PageCache():
+    """
+    Class for a content-addressed cache of fetched pages on disk.
+    Every page is stored once under the SHA-256 of its content, and every URL fetched points to the hash of the page it returned.
+    Files are written to a temporary name and renamed, so threads and separate runs can share a cache.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(os.path.join(directory, "pages"), exist_ok=True)
+        os.makedirs(os.path.join(directory, "urls"), exist_ok=True)
+
+    def url_path(self, url):
+        """
+        Returns the path of the file holding the hash of the page fetched from a URL.
+        """
+        return os.path.join(self.directory, "urls", hashlib.sha256(url.encode()).hexdigest())
+
+    def page_path(self, digest):
+        """
+        Returns the path of the page with a SHA-256 hex digest.
+        """
+        return os.path.join(self.directory, "pages", digest + ".html")
+
+    def write(self, path, data):
+        """
+        Writes data to path in one step by writing a temporary file next to it and renaming it.
+        """
+        handle, temporary = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(handle, "wb") as f:
+            f.write(data)
+        os.replace(temporary, path)
 
+    def get(self, url):
+        """
+        Returns the cached page for a URL, or None if it has not been fetched.
+        """
+        try:
+            with open(self.url_path(url)) as f:
+                digest = f.read()
+            with open(self.page_path(digest), encoding="utf-8") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
 
-def get_puzzle(site, level):
+    def put(self, url, page):
+        """
+        Stores a page fetched from a URL.
+        """
+        data = page.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        if not os.path.exists(self.page_path(digest)):
+            self.write(self.page_path(digest), data)
+        self.write(self.url_path(url), digest.encode())
+
+
+def fetch(url, session=None, cache=None, timeout=30):
+    """
+    Returns the page at a URL, from cache if it has it and otherwise fetched with session (or a plain request) and added to cache.
+    """
+    page = cache.get(url) if cache is not None else None
+    if page is None:
+        response = (session or requests).get(url, timeout=timeout)
+        response.raise_for_status()
+        page = response.text
+        if cache is not None:
+            cache.put(url, page)
+    return page
+
+
+def get_puzzle(site, level, session=None, cache=None):
     """
     Given the websudoku URL and a query for puzzle difficulty, return a list of lists where each list is a row of one random puzzle
     of corresponding difficulty.
     """
-    # Get HTML for website, find rows of table with puzzle values
-    website = requests.get(site + level).text
-    siteHTML = bs(website, 'lxml')
-    puzzleTable = siteHTML.find("table", {'id': "puzzle_grid"})
-    rows = puzzleTable.find_all('tr')
+    return parse_puzzle(fetch(site + level, session, cache))
 
-    puzzle = []
-    for row in rows:
-        # Get each box of given row
-        values = row.find_all('td')
-        newRow = []
 
-        for value in values:
-            # If box is not empty, the value will be in the value attribute of an input inside the td
+def harvest(site, level, setIds, workers=8, session=None, cache=None):
+    """
+    Generator that yields a (setId, puzzle) tuple for every websudoku puzzle number in setIds, in order, fetching up to workers pages at once.
+    No more than 2 * workers pages are fetched ahead of the one being yielded, so memory stays bounded however many puzzles are harvested.
+    Puzzles whose pages cannot be fetched or parsed are reported on stderr and skipped.
+    """
+    if session is None:
+        session = make_session(workers)
+
+    def get(setId):
+        return get_puzzle(site, f"{level}&set_id={setId}", session, cache)
+
+    with ThreadPoolExecutor(workers) as executor:
+        pending = []
+        setIds = iter(setIds)
+        while True:
+            # Keep the window of pages being fetched full
+            for setId in setIds:
+                pending.append((setId, executor.submit(get, setId)))
+                if len(pending) >= 2 * workers:
+                    break
+            if not pending:
+                return
+            setId, future = pending.pop(0)
             try:
-                number = value.find("input").attrs['value']
-                newRow.append(int(number))
-            # If value does not exist for a td, the box is empty
-            except KeyError:
-                newRow.append(0)
-        puzzle.append(newRow)
-
-    return puzzle
\ No newline at end of file
+                yield setId, future.result()
+            except (requests.RequestException, ValueError) as error:
+                print(f"skipping puzzle {setId} of level {level}: {error}", file=sys.stderr)
+
+
+def with_solutions(puzzles):
+    """
+    Generator that yields a (puzzle, solution) tuple for every puzzle, skipping puzzles with no solution.
+    """
+    for puzzle in puzzles:
+        try:
+            yield puzzle, solve(puzzle, False, True)
+        except Exception:
+            continue
+
+
+def main():
+    """
+    Command line entry point for harvesting many websudoku puzzles of every level into a corpus file.
+    """
+    parser = argparse.ArgumentParser(description="Harvest websudoku puzzles into a corpus file.")
+    parser.add_argument("--site", default="https://www.websudoku.com/?level=")
+    parser.add_argument("--count", type=int, default=100, help="puzzles per level")
+    parser.add_argument("--first", type=int, default=1, help="first websudoku puzzle number to fetch")
+    parser.add_argument("--workers", type=int, default=8, help="pages fetched at once")
+    parser.add_argument("--cache", default="scrape-cache", help="directory of cached pages")
+    parser.add_argument("--out", default="scraped.corpus")
+    args = parser.parse_args()
+
+    session = make_session(args.workers)
+    cache = PageCache(args.cache)
+    setIds = range(args.first, args.first + args.count)
+    start = time.perf_counter()
+    # Levels are harvested one after another as write_corpus streams them to disk
+    levels = {
+        difficulty: with_solutions(puzzle for _, puzzle in harvest(args.site, level, setIds, args.workers, session, cache))
+        for level, difficulty in LEVELS.items()
+    }
+    counts = write_corpus(args.out, levels)
+    elapsed = time.perf_counter() - start
+    print(f"{sum(counts.values())} puzzles written to {args.out} in {elapsed:.2f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
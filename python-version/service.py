@@ -0,0 +1,346 @@
+import argparse
+import json
+import multiprocessing
+import queue
+import random
+import signal
+import sys
+import threading
+import time
+
+from canonical import SolveCache
+from codec import from_line, to_line
+from generate import DIFFICULTIES, generate_graded, generate_puzzle
+from sudoku import BACKENDS, count_solutions, solve
+from validate import check_boards
+
+OPERATIONS = ("solve", "validate", "generate")
+# Seconds a request may spend in a worker unless it asks for its own timeout
+TIMEOUT = 5.0
+BATCH_SIZE = 16
+# Seconds to wait for more requests to fill a batch once the first one has arrived
+BATCH_WAIT = 0.002
+# Latencies kept for percentiles, the most recent ones
+LATENCY_SAMPLES = 10000
+# SolveCache of every worker process, or None when the service runs without a cache
+CACHE = None
+
+
+class Timeout(Exception):
+    """
+    Raised inside a worker when a request runs longer than its timeout.
+    """
+
+
+def on_alarm(signum, frame):
+    """
+    Signal handler that stops whatever the worker is running when a request's timer runs out.
+    """
+    raise Timeout()
+
+
+def warm_worker(cacheSize=0):
+    """
+    Runs once in every worker process: seeds it separately, installs the timeout alarm, sets up its SolveCache if cacheSize is above 0
+    and solves a puzzle so that the first real request does not pay for first-use setup.
+    """
+    global CACHE
+    CACHE = SolveCache(cacheSize) if cacheSize > 0 else None
+    random.seed()
+    signal.signal(signal.SIGALRM, on_alarm)
+    solve(generate_puzzle(0)[0], False, True)
+
+
+def as_grid(puzzle):
+    """
+    Returns a puzzle sent as an 81-character line or a list of lists as a list of lists.
+    Raises ValueError for any value outside 0 to 9, so a bad puzzle fails on its own instead of in check_boards for the whole batch.
+    """
+    if isinstance(puzzle, str):
+        return from_line(puzzle)
+    if len(puzzle) != 9 or any(len(row) != 9 for row in puzzle):
+        raise ValueError("Puzzle must be 9 rows of 9 numbers")
+    grid = [[int(value) for value in row] for row in puzzle]
+    if any(not 0 <= value <= 9 for row in grid for value in row):
+        raise ValueError("Puzzle values must be 0 to 9")
+    return grid
+
+
+def as_timeout(timeout):
+    """
+    Returns the timeout a request asked for as a float, raising ValueError unless it is a positive number of seconds.
+    A timeout of 0 would turn the alarm off, so every request keeps a limit.
+    """
+    if isinstance(timeout, bool) or not isinstance(timeout, (int, float)) or not 0 < timeout < float("inf"):
+        raise ValueError(f"Timeout must be a positive number of seconds: {timeout!r}")
+    return float(timeout)
+
+
+def run_request(request, grid, check):
+    """
+    Does the work for one solve, validate or generate request and returns the fields of its response.
+    check is the row of check_boards for a validate request.
+    """
+    op = request["op"]
+    if op == "solve":
+        backend = request.get("backend", "propagate")
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend {backend!r}")
+        # The cache solves with the propagate backend, so a request for another backend is always searched with that one
+        if CACHE is not None and backend == "propagate":
+            return {"solution": to_line(CACHE.solve(grid))}
+        return {"solution": to_line(solve(grid, False, backend=backend))}
+    if op == "validate":
+        result = {"valid": bool(check[0]), "complete": bool(check[1])}
+        # Count up to 2 solutions, so 2 means the puzzle is not unique
+        if not result["valid"]:
+            result["solutions"] = 0
+        elif CACHE is not None:
+            result["solutions"] = CACHE.count_solutions(grid, 2)
+        else:
+            result["solutions"] = count_solutions(grid, 2)
+        return result
+    difficulty = request.get("difficulty", 0)
+    if request.get("graded"):
+        puzzle, solution = generate_graded(difficulty)
+    elif difficulty in DIFFICULTIES:
+        puzzle, solution = generate_puzzle(difficulty)
+    else:
+        raise ValueError(f"Unknown difficulty {difficulty!r}")
+    return {"puzzle": to_line(puzzle), "solution": to_line(solution)}
+
+
+def handle_batch(batch):
+    """
+    Handles a batch of requests in a worker process and returns a list with one response dictionary for each.
+    Validate requests in the batch are checked for broken rules together with one check_boards call.
+    Every request is stopped with an "error": "timeout" response once it has run for its timeout.
+    """
+    grids = [None] * len(batch)
+    errors = [None] * len(batch)
+    timeouts = [TIMEOUT] * len(batch)
+    for i, request in enumerate(batch):
+        try:
+            if request.get("op") not in OPERATIONS:
+                raise ValueError(f"Unknown op {request.get('op')!r}")
+            timeouts[i] = as_timeout(request.get("timeout", TIMEOUT))
+            if request["op"] != "generate":
+                grids[i] = as_grid(request["puzzle"])
+        except (KeyError, TypeError, ValueError) as error:
+            errors[i] = str(error) or repr(error)
+
+    checks = dict()
+    toCheck = [i for i, request in enumerate(batch) if request.get("op") == "validate" and errors[i] is None]
+    if toCheck:
+        result = check_boards([grids[i] for i in toCheck])
+        checks = {i: (result.valid[n], result.complete[n]) for n, i in enumerate(toCheck)}
+
+    responses = []
+    for i, request in enumerate(batch):
+        response = {"id": request.get("id")}
+        if errors[i] is not None:
+            response["error"] = errors[i]
+            responses.append(response)
+            continue
+        start = time.perf_counter()
+        hits = CACHE.hits if CACHE is not None else 0
+        try:
+            signal.setitimer(signal.ITIMER_REAL, timeouts[i])
+            fields = run_request(request, grids[i], checks.get(i))
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            response.update(fields)
+            if CACHE is not None and CACHE.hits > hits:
+                response["cached"] = True
+        except Timeout:
+            response["error"] = "timeout"
+        except Exception as error:
+            response["error"] = str(error) or repr(error)
+        finally:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+        response["seconds"] = time.perf_counter() - start
+        responses.append(response)
+    return responses
+
+
+class Metrics():
+    """
+    Class for counting requests and keeping recent latencies, from a request being read to its response being written.
+    """
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.requests = {op: 0 for op in OPERATIONS}
+        self.errors = 0
+        self.timeouts = 0
+        # Requests answered from a worker's SolveCache
+        self.cacheHits = 0
+        self.batches = 0
+        self.latencies = []
+        self.lock = threading.Lock()
+
+    def record(self, op, response, latency):
+        """
+        Records a finished request.
+        """
+        with self.lock:
+            if op in self.requests:
+                self.requests[op] += 1
+            if response.get("error") == "timeout":
+                self.timeouts += 1
+            elif "error" in response:
+                self.errors += 1
+            if response.get("cached"):
+                self.cacheHits += 1
+            self.latencies.append(latency)
+            if len(self.latencies) > 2 * LATENCY_SAMPLES:
+                del self.latencies[:-LATENCY_SAMPLES]
+
+    def to_dict(self):
+        """
+        Returns the counters, throughput in requests per second and latency percentiles in milliseconds as a dictionary.
+        """
+        with self.lock:
+            latencies = sorted(self.latencies[-LATENCY_SAMPLES:])
+            total = sum(self.requests.values())
+            elapsed = time.perf_counter() - self.start
+            result = {
+                "requests": dict(self.requests),
+                "errors": self.errors,
+                "timeouts": self.timeouts,
+                "cacheHits": self.cacheHits,
+                "batches": self.batches,
+                "requestsPerBatch": total / self.batches if self.batches else 0.0,
+                "requestsPerSecond": total / elapsed if elapsed else 0.0,
+            }
+        for name, fraction in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99)):
+            result[name + "Ms"] = latencies[min(len(latencies) - 1, int(fraction * len(latencies)))] * 1000 if latencies else 0.0
+        return result
+
+
+class Service():
+    """
+    Class for a long-running solve, validate and generate service that reads JSON requests and writes JSON responses, one per line.
+    Requests are gathered into batches and handed to a pool of warm worker processes; responses are written as batches finish,
+    so they can come back in a different order than the requests and carry the id of their request.
+    A {"op": "metrics"} request is answered straight away with the current Metrics.
+    """
+
+    def __init__(self, out, workers=None, batchSize=BATCH_SIZE, batchWait=BATCH_WAIT, cacheSize=0):
+        """
+        out -- Text file responses are written to\n
+        workers -- Number of worker processes (default: one per CPU)\n
+        batchSize -- Most requests sent to a worker at once\n
+        batchWait -- Seconds to wait for a batch to fill before sending it\n
+        cacheSize -- Entries in every worker's SolveCache for solve and validate requests, or 0 for no cache\n
+        """
+        self.out = out
+        self.batchSize = batchSize
+        self.batchWait = batchWait
+        self.metrics = Metrics()
+        self.writeLock = threading.Lock()
+        self.workers = workers or multiprocessing.cpu_count()
+        self.pool = multiprocessing.Pool(self.workers, initializer=warm_worker, initargs=(cacheSize,))
+        # Only a few batches per worker are in flight, and serve reads only a few batches ahead of them,
+        # so a fast client cannot fill memory with queued work
+        self.slots = threading.Semaphore(2 * self.workers)
+
+    def write(self, response):
+        """
+        Writes one response line; the lock keeps lines from the reader and the pool's result thread from mixing.
+        """
+        with self.writeLock:
+            self.out.write(json.dumps(response) + "\n")
+            self.out.flush()
+
+    def finish(self, batch, received, responses):
+        """
+        Writes the responses for a batch and records their latencies. Runs in the pool's result thread.
+        """
+        now = time.perf_counter()
+        for request, start, response in zip(batch, received, responses):
+            self.write(response)
+            self.metrics.record(request.get("op"), response, now - start)
+        self.slots.release()
+
+    def send(self, batch, received):
+        """
+        Hands a batch to the worker pool.
+        """
+        self.slots.acquire()
+        with self.metrics.lock:
+            self.metrics.batches += 1
+
+        def failed(error):
+            self.finish(batch, received, [{"id": request.get("id"), "error": repr(error)} for request in batch])
+
+        self.pool.apply_async(handle_batch, (batch,), callback=lambda responses: self.finish(batch, received, responses),
+                              error_callback=failed)
+
+    def serve(self, lines):
+        """
+        Handles requests from an iterable of JSON lines until it runs out, then waits for every response to be written.
+        """
+        # Reading stops once this many requests wait for a batch, until the workers catch up
+        incoming = queue.Queue(2 * self.batchSize * self.workers)
+
+        def read():
+            for line in lines:
+                if line.strip():
+                    incoming.put((line, time.perf_counter()))
+            incoming.put(None)
+
+        threading.Thread(target=read, daemon=True).start()
+        done = False
+        while not done:
+            batch = []
+            received = []
+            item = incoming.get()
+            deadline = time.perf_counter() + self.batchWait
+            while item is not None:
+                line, start = item
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError("Request must be a JSON object")
+                except ValueError as error:
+                    self.write({"id": None, "error": f"Bad request: {error}"})
+                    request = None
+                if request is not None and request.get("op") == "metrics":
+                    self.write({"id": request.get("id"), "metrics": self.metrics.to_dict()})
+                elif request is not None:
+                    batch.append(request)
+                    received.append(start)
+                if len(batch) >= self.batchSize:
+                    break
+                try:
+                    item = incoming.get(timeout=max(0.0, deadline - time.perf_counter()))
+                except queue.Empty:
+                    break
+            done = item is None
+            if batch:
+                self.send(batch, received)
+
+        self.pool.close()
+        self.pool.join()
+
+
+def main():
+    """
+    Command line entry point that serves JSON-lines requests from stdin and writes responses to stdout.
+    """
+    parser = argparse.ArgumentParser(description="Serve solve, validate and generate requests as JSON lines on stdin and stdout.")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes (default: one per CPU)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--batch-wait", type=float, default=BATCH_WAIT, help="seconds to wait for a batch to fill")
+    parser.add_argument("--cache", type=int, default=0,
+                        help="entries in every worker's cache of solutions by canonical form (default: off); "
+                             "it only helps when equivalent or hard puzzles are sent again")
+    args = parser.parse_args()
+
+    service = Service(sys.stdout, args.workers, args.batch_size, args.batch_wait, args.cache)
+    service.serve(sys.stdin)
+    print(json.dumps(service.metrics.to_dict()), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
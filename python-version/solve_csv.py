@@ -0,0 +1,219 @@
+import argparse
+import glob
+import io
+import itertools
+import multiprocessing
+import os
+import sys
+import time
+
+from batch import MULTIPLE, NO_SOLUTION, SOLVED, solve_many
+from canonical import SolveCache
+from codec import SIZE, read_csv, write_csv
+
+# Puzzles read, solved and written at a time, so memory stays the same however long a file is
+CHUNK_SIZE = 500
+# Answer file written for a single input file, the same name the C version writes
+ANSWER_CSV = "answer.csv"
+
+
+def csv_files(paths):
+    """
+    Returns the puzzle files for a list of paths, where a directory stands for every .csv file in it in name order and - stands for stdin.
+    """
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(glob.glob(os.path.join(path, "*.csv"))))
+        else:
+            files.append(path)
+    return files
+
+
+def chunks(puzzles, size):
+    """
+    Generator that yields lists of up to size puzzles from an iterable of puzzles.
+    """
+    puzzles = iter(puzzles)
+    chunk = list(itertools.islice(puzzles, size))
+    while chunk:
+        yield chunk
+        chunk = list(itertools.islice(puzzles, size))
+
+
+def write_answers(out, puzzles, first):
+    """
+    Writes puzzle grids like write_csv, but with a newline between rows instead of after every row, the way the C version writes answer.csv.
+    The C version reads until the end of the file and fails on a trailing newline, so a one-puzzle answer file can be read back by it.
+    first -- Whether nothing has been written to out yet\n
+    """
+    text = io.StringIO()
+    write_csv(text, puzzles)
+    out.write(("" if first else "\n") + text.getvalue().rstrip("\n"))
+
+
+def solve_chunk(chunk, workers=None, pool=None, cache=None):
+    """
+    Returns (solved, statuses) for a list of puzzles like solve_many, with solved as a list of grids.
+    With a SolveCache, puzzles equivalent to one already solved are answered from it, and only the first of every group of
+    equivalent puzzles in the chunk is passed on to solve_many.
+    """
+    if cache is None:
+        solved, statuses = solve_many(chunk, workers, pool)
+        return solved.tolist(), statuses
+
+    solved = [None] * len(chunk)
+    statuses = [None] * len(chunk)
+    forms = [None] * len(chunk)
+    # Dictionary relating the canonical key of every puzzle to be solved to the indexes in chunk that share it
+    groups = dict()
+    toSolve = []
+    for i, puzzle in enumerate(chunk):
+        forms[i], solution, count = cache.lookup(puzzle)
+        if count is not None:
+            solved[i] = solution or [[0] * SIZE for _ in range(SIZE)]
+            statuses[i] = SOLVED if count == 1 else (NO_SOLUTION if count == 0 else MULTIPLE)
+            continue
+        # Puzzles that could not be canonicalized are solved on their own under their index
+        key = i if forms[i] is None else forms[i][0]
+        if key not in groups:
+            groups[key] = []
+            toSolve.append(i)
+        else:
+            # Answered without a search by the first puzzle of its group, so it counts as a hit
+            cache.misses -= 1
+            cache.hits += 1
+        groups[key].append(i)
+
+    if toSolve:
+        results, resultStatuses = solve_many([chunk[i] for i in toSolve], workers, pool)
+        for first, result, status in zip(toSolve, results.tolist(), resultStatuses):
+            count = {SOLVED: 1, NO_SOLUTION: 0}.get(status, 2)
+            if forms[first] is None:
+                solved[first], statuses[first] = result, status
+                continue
+            cache.store(forms[first], None if status == NO_SOLUTION else result, count)
+            # The other puzzles in the group get the solution through the canonical grid they share with the first
+            canonical = forms[first][1].apply(result)
+            for i in groups[forms[first][0]]:
+                solved[i] = result if i == first or status == NO_SOLUTION else forms[i][1].undo(canonical)
+                statuses[i] = status
+    return solved, statuses
+
+
+def solve_file(f, out, workers=None, pool=None, chunkSize=CHUNK_SIZE, cache=None):
+    """
+    Solves every puzzle in an open text file in the C version's comma-separated format and writes the answers to another in the same format,
+    reading, solving and writing chunkSize puzzles at a time.
+    Puzzles with no solution are written as a grid of zeros, and puzzles with more than one solution are written with one of them.
+    Returns a dictionary with the number of puzzles answered, how many had no solution or more than one, the seconds taken,
+    and "error", the message for a part of the file that could not be read, after which the file is skipped, or None.
+
+    workers -- Number of processes for the search, passed on to solve_many\n
+    pool -- multiprocessing.Pool to search in, shared by every file\n
+    chunkSize -- Most puzzles held in memory at once\n
+    cache -- SolveCache to answer puzzles equivalent to earlier ones from, kept across files\n
+    """
+    report = {"puzzles": 0, NO_SOLUTION: 0, MULTIPLE: 0, "error": None}
+    start = time.perf_counter()
+    try:
+        for chunk in chunks(read_csv(f), chunkSize):
+            solved, statuses = solve_chunk(chunk, workers, pool, cache)
+            write_answers(out, solved, report["puzzles"] == 0)
+            report["puzzles"] += len(chunk)
+            report[NO_SOLUTION] += statuses.count(NO_SOLUTION)
+            report[MULTIPLE] += statuses.count(MULTIPLE)
+    except ValueError as error:
+        # The rest of a file that can't be read is skipped, keeping the answers already written
+        report["error"] = str(error)
+    report["seconds"] = time.perf_counter() - start
+    return report
+
+
+def answer_path(path, out, single):
+    """
+    Returns where the answers for the puzzle file at path go: out itself for a single input file, or a file with the same name in the out directory.
+    """
+    if single:
+        return out
+    return os.path.join(out, "stdin.csv" if path == "-" else os.path.basename(path))
+
+
+def print_report(name, report):
+    """
+    Prints the timing line for one file to stderr.
+    """
+    seconds = report["seconds"]
+    rate = report["puzzles"] / seconds if seconds else 0.0
+    print(f"{name}: {report['puzzles']} puzzles in {seconds:.2f}s ({rate:.1f} puzzles/s), "
+          f"{report[NO_SOLUTION]} with no solution, {report[MULTIPLE]} with more than one", file=sys.stderr)
+    if report.get("error"):
+        print(f"{name}: skipped the rest of the file: {report['error']}", file=sys.stderr)
+
+
+def main():
+    """
+    Command line entry point that solves puzzle files in the C version's CSV format and writes answer files in the same format.
+    """
+    parser = argparse.ArgumentParser(description="Solve sudoku puzzles from CSV files in the format the C version reads.")
+    parser.add_argument("paths", nargs="*", default=["puzzle.csv"],
+                        help="puzzle files, directories of .csv files or - for stdin; a file may hold many puzzles one after another")
+    parser.add_argument("--out", default=None,
+                        help=f"answer file for a single input file (default: {ANSWER_CSV}, - for stdout), "
+                             "or the directory answer files are written to for several (default: answers)")
+    parser.add_argument("--workers", type=int, default=None, help="number of search processes (default: one per CPU)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="most puzzles held in memory at once")
+    parser.add_argument("--cache", type=int, default=0,
+                        help="answer puzzles equivalent to one of the last CACHE solved from a cache (default: off); "
+                             "it costs about as much as solving an easy puzzle, so it only helps files with many equivalent or hard puzzles")
+    args = parser.parse_args()
+    cache = SolveCache(args.cache) if args.cache > 0 else None
+
+    files = csv_files(args.paths)
+    single = len(args.paths) == 1 and not os.path.isdir(args.paths[0])
+    out = args.out or (ANSWER_CSV if single else "answers")
+    if not single:
+        os.makedirs(out, exist_ok=True)
+
+    total = {"puzzles": 0, NO_SOLUTION: 0, MULTIPLE: 0, "seconds": 0.0}
+    # Files that could not be opened or read to the end
+    failed = 0
+    pool = None if args.workers == 1 else multiprocessing.Pool(args.workers)
+    try:
+        for path in files:
+            target = answer_path(path, out, single)
+            try:
+                source = sys.stdin if path == "-" else open(path)
+            except OSError as error:
+                print(f"{path}: skipped: {error}", file=sys.stderr)
+                failed += 1
+                continue
+            answers = sys.stdout if target == "-" else open(target, "w")
+            try:
+                report = solve_file(source, answers, args.workers, pool, args.chunk_size, cache)
+            finally:
+                if source is not sys.stdin:
+                    source.close()
+                if answers is not sys.stdout:
+                    answers.close()
+            print_report(path, report)
+            failed += report["error"] is not None
+            for key in total:
+                total[key] += report[key]
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    if len(files) > 1:
+        print_report("total", total)
+    if cache is not None:
+        stats = cache.stats()
+        print(f"cache: {stats['hits']} hits, {stats['misses']} misses ({stats['hitRate']:.1%}), {stats['skipped']} puzzles not canonicalized",
+              file=sys.stderr)
+    if failed:
+        sys.exit(f"{failed} of {len(files)} files could not be read to the end")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,12 @@
-import copy
+import time
 
 from helper import StackFrontier
+from dlx import DancingLinks
+from engine import Search
 
 NUMBERS = [1, 2, 3, 4, 5, 6, 7, 8, 9]
+# Solver backends that solve can use
+BACKENDS = ("bitmask", "propagate", "dlx", "backtrack")
 
 
 def check_mini_grid(puzzle, space):
@@ -57,44 +61,141 @@ def check_row_or_column(array):
     return numberList
 
 
-def solve(puzzle, numEndings):
+def solve(puzzle, numEndings, propagate=False, stats=None, backend="bitmask"):
+    """
+    Takes a starting puzzle grid for a sudoku game and returns a solution grid, or the number of solutions if numEndings is truthy.
+    If stats is a SolverStats, the search's counters are added to it.
+    The "bitmask" and "propagate" backends also solve larger grids like 16x16 and 25x25; the others only solve 9x9 grids.
+
+    backend -- One of BACKENDS:\n
+        "bitmask" uses the bitmask engine, which undoes moves in place instead of copying the grid for every node\n
+        "propagate" also fills singles before every guess and guesses on the most constrained space (same as propagate=True)\n
+        "dlx" solves the puzzle as an exact cover problem with dancing links\n
+        "backtrack" is the original row-major backtracker that pushes a copied 81-byte state for every node\n
+    """
+    if propagate:
+        backend = "propagate"
+    if backend == "backtrack":
+        if len(puzzle) != 9:
+            raise ValueError("The backtrack backend only solves 9x9 puzzles")
+        return solve_backtrack(puzzle, numEndings, stats)
+
+    search = make_search(puzzle, backend)
+    start = time.perf_counter()
+    if numEndings:
+        result = sum(1 for _ in search.solutions())
+    else:
+        result = next(search.solutions(), None)
+
+    if stats is not None:
+        stats.record_search(search, time.perf_counter() - start, result if numEndings else int(result is not None))
+    if result is None:
+        raise Exception("No solution")
+    return result
+
+
+def make_search(puzzle, backend):
+    """
+    Returns the search object for a backend other than "backtrack". Its solutions() method yields every solution grid.
+    """
+    if backend == "dlx":
+        if len(puzzle) != 9:
+            raise ValueError("The dlx backend only solves 9x9 puzzles")
+        return DancingLinks(puzzle)
+    elif backend in ("bitmask", "propagate"):
+        return Search(puzzle, backend == "propagate")
+    raise ValueError(f"Unknown backend {backend!r}, expected one of {BACKENDS[:-1]}")
+
+
+def count_solutions(puzzle, limit=2, stats=None, backend="propagate"):
+    """
+    Returns the number of solutions for a puzzle grid, stopping the search as soon as limit solutions have been found.
+    If limit is None, every solution is counted. If stats is a SolverStats, the search's counters are added to it.
+    """
+    search = make_search(puzzle, backend)
+    start = time.perf_counter()
+    count = 0
+    for _ in search.solutions():
+        count += 1
+        if count == limit:
+            break
+
+    if stats is not None:
+        stats.record_search(search, time.perf_counter() - start, count)
+    return count
+
+
+def has_unique_solution(puzzle, stats=None):
+    """
+    Returns True if a puzzle grid has exactly one solution.
+    """
+    return count_solutions(puzzle, 2, stats) == 1
+
+
+def solve_backtrack(puzzle, numEndings, stats=None):
     """
     Takes a starting puzzle grid for a sudoku game and returns a solution grid using the backtracking algorithm.
+    Row-major backtracker that pushes a copied 81-byte state per node, kept for comparison with solve.
+    Frontier states are flat bytearrays, which are much smaller and faster to copy than lists of lists.
+    If stats is a SolverStats, nodes, dead ends, frontier size and time spent in available() and copying are added to it.
     """
     counter = 0
     frontier = StackFrontier()
+    # Only wrap available and copying with timers when stats are wanted
+    getAvailable = available
+    child_state = change_flat_state
+    if stats is not None:
+        stats.solverCalls += 1
+        start = time.perf_counter()
+        getAvailable = stats.timer("availableTime", available)
+        child_state = stats.timer("copyTime", change_flat_state)
+
     # Get possible actions for the first empty space in the grid as well as coordinates for the space
-    options = available(puzzle)
+    options = getAvailable(puzzle)
+    state = bytearray(value for row in puzzle for value in row)
 
     for option in options[0]:
         # Add puzzle with possible change implemented to frontier
-        frontier.add(change_state(copy.deepcopy(puzzle), options[1], option))
+        frontier.add(child_state(state, options[1], option))
 
     while True:
         # No solution if no possible paths
         if frontier.empty():
+            if stats is not None:
+                stats.solutions += counter
+                stats.solveTime += time.perf_counter() - start
             if not numEndings:
                 raise Exception("No solution")
             return counter
 
+        if stats is not None:
+            stats.maxFrontier = max(stats.maxFrontier, len(frontier.frontier))
+            stats.nodes += 1
+
         # Set puzzle equal to first state on stack
-        puzzle = frontier.remove()
+        state = frontier.remove()
+        puzzle = [list(state[i:i + 9]) for i in range(0, 81, 9)]
 
         # Get possible actions for next empty coordinate
-        options = available(puzzle)
+        options = getAvailable(puzzle)
 
         # If there are actions, add them to the frontier
         # If there are no actions possible, no nodes are added to frontier, so when while loop repeats, algorithm backtracks to explore other paths
         if options[0]:
             for option in options[0]:
-                child = change_state(copy.deepcopy(puzzle), options[1], option)
+                child = child_state(state, options[1], option)
                 frontier.add(child)
+        elif options[1] is not None and stats is not None:
+            stats.backtracks += 1
 
         # If there are no empty spaces, puzzle is solved
         if options[1] is None:
             if numEndings:
                 counter += 1
             else:
+                if stats is not None:
+                    stats.solutions += 1
+                    stats.solveTime += time.perf_counter() - start
                 return puzzle
 
 
@@ -106,6 +207,15 @@ def change_state(puzzle, action, number):
     return puzzle
 
 
+def change_flat_state(state, action, number):
+    """
+    Returns a copy of a flat bytearray state with the value at the coordinates of action changed to number.
+    """
+    child = bytearray(state)
+    child[action[0] * 9 + action[1]] = number
+    return child
+
+
 def available(puzzle):
     """
     Returns all possible numbers that can be placed in an empty space as well as the coordinates for the space.
@@ -122,7 +232,7 @@ def available(puzzle):
     
     # Find all numbers that are not possible actions for the empty space by checking mini-grid, row and column
     taken = set(check_mini_grid(puzzle, space) + check_row_or_column(puzzle[space[0]]) + check_row_or_column(column))
-    available = copy.deepcopy(NUMBERS)
+    available = NUMBERS[:]
 
     # Create list of numbers that can be placed in the empty space
     for num in taken:
@@ -0,0 +1,75 @@
+import math
+from collections import namedtuple
+
+import numpy as np
+
+# Digit d is compared against DIGITS[d - 1] to turn a board into one true value per filled space, for 9x9 boards
+DIGITS = np.arange(1, 10, dtype=np.uint8)
+
+# Result of check_boards, where valid and complete have one value per board and rows, columns and boxes have one per space
+BoardCheck = namedtuple("BoardCheck", ["valid", "complete", "rows", "columns", "boxes"])
+
+
+def as_boards(boards):
+    """
+    Returns boards as an (N, S, S) uint8 array, where S is 9 or another square number like 16 or 25.
+    Takes an array, a list of puzzle grids or a single puzzle grid.
+    Raises ValueError naming the board for a value that does not fit in a uint8, which the cast would otherwise wrap or reject.
+    """
+    boards = np.asarray(boards)
+    if boards.dtype != np.uint8 and boards.size:
+        outside = (boards < 0) | (boards > 255)
+        if outside.any():
+            index = tuple(np.argwhere(outside)[0])
+            raise ValueError(f"Board values must be 0 to 255, board {index[0] if boards.ndim == 3 else 0} has {boards[index]}")
+    boards = boards.astype(np.uint8)
+    if boards.ndim == 2:
+        boards = boards[np.newaxis]
+    size = boards.shape[-1] if boards.ndim == 3 else 0
+    if boards.ndim != 3 or boards.shape[1] != size or math.isqrt(size) ** 2 != size or not size:
+        raise ValueError(f"Boards must have shape (N, S, S) for a square number S, got {boards.shape}")
+    return boards
+
+
+def check_boards(boards):
+    """
+    Checks many boards of the same size for broken sudoku rules at once and returns a BoardCheck.
+    Boards are S by S with S a square number, 9 for the standard sudoku.
+
+    valid -- (N,) bool array, True if a board has no repeated digit in any row, column or mini-grid and no value above S\n
+    complete -- (N,) bool array, True if a board has no empty spaces\n
+    rows -- (N, S, S) bool array, True for every space whose digit appears more than once in its row\n
+    columns -- (N, S, S) bool array, True for every space whose digit appears more than once in its column\n
+    boxes -- (N, S, S) bool array, True for every space whose digit appears more than once in its mini-grid\n
+    """
+    boards = as_boards(boards)
+    count, size = boards.shape[:2]
+    box = math.isqrt(size)
+    digits = DIGITS if size == 9 else np.arange(1, size + 1, dtype=np.uint8)
+    # onehot[n, row, column, d] is True if space (row, column) of board n holds digit d + 1
+    onehot = boards[..., np.newaxis] == digits
+
+    # How many times every digit appears in every row, column and mini-grid
+    rowCounts = onehot.sum(axis=2, dtype=np.uint8)
+    columnCounts = onehot.sum(axis=1, dtype=np.uint8)
+    boxCounts = onehot.reshape(count, box, box, box, box, size).sum(axis=(2, 4), dtype=np.uint8)
+    # Spread mini-grid counts back over the spaces of each mini-grid
+    boxCounts = boxCounts.repeat(box, axis=1).repeat(box, axis=2)
+
+    # A space conflicts if its own digit is counted more than once
+    rows = (onehot & (rowCounts[:, :, np.newaxis, :] > 1)).any(axis=3)
+    columns = (onehot & (columnCounts[:, np.newaxis, :, :] > 1)).any(axis=3)
+    boxes = (onehot & (boxCounts > 1)).any(axis=3)
+
+    conflicts = (rows | columns | boxes).any(axis=(1, 2))
+    outOfRange = (boards > size).any(axis=(1, 2))
+    complete = (boards != 0).all(axis=(1, 2))
+    return BoardCheck(~conflicts & ~outOfRange, complete, rows, columns, boxes)
+
+
+def wrong_spaces(boards, solutions):
+    """
+    Returns an (N, S, S) bool array that is True for every filled space that does not match the solution.
+    """
+    boards = as_boards(boards)
+    return (boards != 0) & (boards != as_boards(solutions))